@@ -0,0 +1,79 @@
+import os
+import sys
+import subprocess
+import time
+
+# Startup budgets of the CLI (ms), including interpreter start
+IMPORT_BUDGET = 300
+EXTRACT_BUDGET = 1000
+
+# Modules the CLI must never import
+FORBIDDEN = ['tkinter', '_tkinter']
+
+IMPORT = "import main"
+EXTRACT = """
+import hjson
+import main
+with open({settings!r}, 'r') as file:
+    settings = hjson.load(file)
+rom = main.loadRom(settings)
+rom.extractFile(next(iter(rom.files)))
+"""
+
+
+def run(code, *options):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, *options, '-c', code], capture_output=True, text=True)
+    elapsed = 1000 * (time.perf_counter() - start)
+    if result.returncode:
+        sys.exit(result.stderr)
+    return elapsed, result.stderr
+
+
+# Parse the report of python -X importtime: (cumulative, self, module)
+def importTimes(report):
+    times = []
+    for line in report.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        times.append((int(cumulative) / 1000, int(own) / 1000, name.rstrip()))
+    return times
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit('Usage: python benchmark.py [settings.json] [runs]')
+    settings = sys.argv[1] if len(sys.argv) > 1 else None
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    failed = False
+
+    # Which modules the CLI pulls in, and what they cost
+    _, report = run(IMPORT, '-X', 'importtime')
+    times = importTimes(report)
+    print('Slowest imports (cumulative ms, self ms):')
+    for cumulative, own, name in sorted(times, reverse=True)[:15]:
+        print(f'{cumulative:10.1f} {own:10.1f}  {name}')
+    names = set(name.strip() for _, _, name in times)
+    for name in FORBIDDEN:
+        if name in names:
+            print(f'{name} is imported by the CLI!')
+            failed = True
+
+    # Best of several runs, as launched in batch jobs
+    elapsed = min(run(IMPORT)[0] for _ in range(runs))
+    print(f'Start and import main: {elapsed:.0f} ms (budget {IMPORT_BUDGET} ms)')
+    failed |= elapsed > IMPORT_BUDGET
+
+    if settings:
+        elapsed = min(run(EXTRACT.format(settings=settings))[0] for _ in range(runs))
+        print(f'Time to first extract: {elapsed:.0f} ms (budget {EXTRACT_BUDGET} ms)')
+        failed |= elapsed > EXTRACT_BUDGET
+
+    if failed:
+        sys.exit('Startup budget exceeded.')
+
+
+if __name__ == '__main__':
+    main()
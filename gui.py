@@ -9,8 +9,8 @@ import shutil
 import glob
 import sys
 sys.path.append('src')
-from Utilities import get_filename
-from randomize import SWITCH, STEAM
+from Utilities import load_json
+from randomize import randomize
 from ROM import ROM_SWITCH, ROM_PC
 
 MAIN_TITLE = f"Bravely Randomize 2 v{RELEASE}"
@@ -69,8 +69,7 @@ class GuiApplication:
         self.settings['system'] = tk.StringVar()
         self.rom = None
 
-        with open(get_filename('json/gui.json'), 'r') as file:
-            fields = hjson.loads(file.read())
+        fields = load_json('json/gui.json')
 
         #####################
         # PAKS FOLDER STUFF #
@@ -344,28 +343,6 @@ On Steam the folder name will be something like \nC:\\Program Files\Steam\steama
             self.bottomLabel('Randomizing failed.', 'red', 0)
 
 
-def randomize(rom, settings):
-    try:
-        # Start with a fresh ROM
-        rom.clean()
-        # Load data
-        if settings['system'] == 'Steam':
-            mod = STEAM(rom, settings)
-        elif settings['system'] == 'Switch':
-            mod = SWITCH(rom, settings)
-        else:
-            sys.exit(f"{settings['system']} not included in the randomizer!")
-        # Modify data
-        mod.randomize()
-        mod.qualityOfLife()
-        # Dump pak
-        mod.dump()
-        return True
-    except:
-        mod.failed()
-        return False
-
-
 if __name__ == '__main__':
     if len(sys.argv) > 2:
         print('Usage: python gui.py <settings.json>')
@@ -3,28 +3,32 @@ import hjson
 import sys
 import glob
 sys.path.append('src')
-from gui import randomize
+from randomize import randomize
 from ROM import ROM_SWITCH, ROM_PC
 
-if __name__=='__main__':
-    if len(sys.argv) != 2:
-        sys.exit('Usage: python main.py settings.json')
-    with open(sys.argv[1], 'r') as file:
-        settings = hjson.load(file)
-
-    # Get pak files from selected directory
+# Get pak files from selected directory
+def loadRom(settings):
     filenames = glob.glob(settings['rom'] + '/**/*.pak', recursive=True)
     for pak in filenames:
         if os.path.basename(pak) == 'Sunrise-E-Switch.pak':
             settings['system'] = 'Switch'
-            rom = ROM_SWITCH(pak)
-            break
+            return ROM_SWITCH(pak)
         elif os.path.basename(pak) == 'Bravely_Default_II-WindowsNoEditor.pak':
             settings['system'] = 'Steam'
-            rom = ROM_PC(pak)
-            break
+            return ROM_PC(pak)
+    sys.exit('System neither specified nor found in pak.')
+
+
+if __name__=='__main__':
+    if len(sys.argv) != 2:
+        sys.exit('Usage: python main.py settings.json')
+    with open(sys.argv[1], 'r') as file:
+        settings = hjson.load(file)
+
+    rom = loadRom(settings)
 
-    if 'system' not in settings:
-        sys.exit('System neither specified nor found in pak.')
+    # Optionally keep decompressed files around between runs (size in MiB)
+    if settings.get('file-cache'):
+        rom.enableFileCache(int(settings['file-cache']) * 2**20)
 
     randomize(rom, settings)
@@ -1,6 +1,5 @@
 import random
-from Utilities import get_filename
-import hjson
+from Utilities import load_json
 from copy import deepcopy
 
 
@@ -154,14 +153,11 @@ def shuffleBosses(settings, monsters, parties):
 
 def scaleBosses(parties, monsters, abilities):
 
-    with open(get_filename('json/ability_scalings.json'), 'r') as file:
-        abilityScalings = hjson.load(file)
+    abilityScalings = load_json('json/ability_scalings.json')
 
-    with open(get_filename('json/scalings_physical.json'), 'r') as file:
-        physScalings = hjson.load(file)
+    physScalings = load_json('json/scalings_physical.json')
 
-    with open(get_filename('json/scalings_magic.json'), 'r') as file:
-        magScalings = hjson.load(file)
+    magScalings = load_json('json/scalings_magic.json')
 
     # ONLY NEEDS TO BE DONE FOR ASTERISKS
     asterisks = parties.asterisks # Contains "BattleNum" for scaling
@@ -1,32 +1,72 @@
 import sys
 import struct
-import io
 import hashlib
 from functools import partial
 from copy import copy, deepcopy
+from array import array
+from collections.abc import MutableMapping, MutableSequence
+from operator import attrgetter, itemgetter
+
+
+# Precompiled layouts
+INT8 = struct.Struct("<b")
+UINT8 = struct.Struct("<B")
+INT32 = struct.Struct("<l")
+UINT32 = struct.Struct("<L")
+INT64 = struct.Struct("<q")
+UINT64 = struct.Struct("<Q")
+FLOAT = struct.Struct("<f")
+HEADER = struct.Struct("<qq")
+
+# Bytes between a property's size and its data
+PROPERTY_PADDING = {
+    'BoolProperty': 2, # value is stored here; size is 0
+    'ByteProperty': 9,
+    'EnumProperty': 9,
+    'ArrayProperty': 9,
+    'StructProperty': 25,
+    'FloatProperty': 1,
+    'IntProperty': 1,
+    'UInt32Property': 1,
+    'NameProperty': 1,
+    'StrProperty': 1,
+    'SoftObjectProperty': 1,
+    'TextProperty': 1,
+}
+
+# Properties with a single numeric value, and their dtypes in column views
+NUMERIC_PROPERTIES = {
+    'IntProperty': '<i4',
+    'UInt32Property': '<u4',
+    'FloatProperty': '<f4',
+    'BoolProperty': 'i1',
+    'ByteProperty': 'i1',
+}
 
 
 class TYPE:
+    __slots__ = ()
+
     def getInt8(self, value):
-        return struct.pack("<b", value)
+        return INT8.pack(value)
 
     def getUInt8(self, value):
-        return struct.pack("<B", value)
+        return UINT8.pack(value)
 
     def getInt32(self, value):
-        return struct.pack("<l", value)
+        return INT32.pack(value)
 
     def getUInt32(self, value):
-        return struct.pack("<L", value)
+        return UINT32.pack(value)
 
     def getInt64(self, value):
-        return struct.pack("<q", value)
+        return INT64.pack(value)
 
     def getUInt64(self, value):
-        return struct.pack("<Q", value)
+        return UINT64.pack(value)
 
     def getFloat(self, value):
-        return struct.pack("<f", value)
+        return FLOAT.pack(value)
 
     def getString(self, string):
         tmp = string.encode() + b'\x00'
@@ -40,62 +80,170 @@ class TYPE:
     def getSHA(self, sha):
         return sha.encode() + b'\x00'
 
+    # Callbacks into DATA, the uasset, and raw data are shared rather than copied
     def __deepcopy__(self, memo):
         cls = self.__class__
         result = cls.__new__(cls)
         memo[id(self)] = result
-        for k, v in self.__dict__.items():
+        for k in getAttributes(cls):
             try:
-                setattr(result, k, deepcopy(v, memo))
-            except:
-                setattr(result, k, v) # Don't deepcopy the functions!
+                v = getattr(self, k)
+            except AttributeError: # Unset slot
+                continue
+            if not k.startswith('callback') and k not in ('uasset', 'raw'):
+                v = deepcopy(v, memo)
+            setattr(result, k, v)
         return result
 
 
+# Names of all instance attributes, whether in __slots__ or __dict__
+def getAttributes(cls):
+    attributes = []
+    for c in cls.__mro__:
+        attributes += c.__dict__.get('__slots__', ())
+        if '__dict__' in c.__dict__:
+            attributes.append('__dict__')
+    return attributes
+
+
+# Attribute that flags its property as dirty when changed.
+# Loading writes straight to the underscored attribute.
+def tracked(name):
+    key = '_' + name
+    def setValue(self, value):
+        old = getattr(self, key, None)
+        if old is not value and old != value:
+            self.dirty = True
+        setattr(self, key, value)
+    return property(attrgetter(key), setValue)
+
+
+# Base of all properties.
+# Fixed width values can be patched in place at the recorded offset of the
+# property's size: layout is the value's struct and valueOffset its position.
+class PROPERTY(TYPE):
+    __slots__ = ('offset', 'dirty')
+    layout = None
+    valueOffset = 0
+
+    def isDirty(self):
+        return self.dirty
+
+    # Returns False when the property must be rebuilt instead
+    def patch(self, data, uasset):
+        if not self.dirty:
+            return True
+        if self.layout is None:
+            return False
+        self.layout.pack_into(data, self.offset + self.valueOffset, self.value)
+        return True
+
+
+# Fixed width properties as read by LAYOUT: struct format of everything
+# following the header, constant fields, and slots filled from the fields
+# as (slot, field, isName).
+FIXED_PROPERTIES = {
+    'IntProperty': ('qxl', {0: 4}, [('_value', 1, False)]),
+    'UInt32Property': ('qxL', {0: 4}, [('_value', 1, False)]),
+    'FloatProperty': ('qxf', {0: 4}, [('_value', 1, False)]),
+    'BoolProperty': ('qbx', {0: 0}, [('_value', 1, False)]),
+    'NameProperty': ('qxq', {0: 8}, [('_name', 1, True)]),
+    'EnumProperty': ('qqbq', {0: 8, 2: 0}, [('_value0', 1, True), ('_value', 3, True)]),
+    'ByteProperty': ('qqxb', {0: 1}, [('_none', 1, False), ('_value', 2, False)]),
+    'Vector': ('qq17xlll', {}, [('_structSize', 0, False), ('_structType', 1, True), ('_x', 2, False), ('_y', 3, False), ('_z', 4, False)]),
+    'LinearColor': ('qq17xffff', {}, [('_structSize', 0, False), ('_structType', 1, True), ('_r', 2, False), ('_g', 3, False), ('_b', 4, False), ('_a', 5, False)]),
+}
+
+
+# Cursor over the data; nothing is copied until bytes/strings are read
 class FILE(TYPE):
     def __init__(self, data):
-        self.data = io.BytesIO(data)
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self.offset
+        elif whence == 2:
+            offset += len(self.data)
+        self.offset = offset
+        return offset
+
+    def tell(self):
+        return self.offset
+
+    def read(self, size=-1):
+        start = self.offset
+        if size < 0:
+            self.offset = len(self.data)
+        else:
+            self.offset = min(start + size, len(self.data))
+        return bytes(self.data[start:self.offset])
 
     def readInt8(self):
-        return struct.unpack("<b", self.data.read(1))[0]
+        offset = self.offset
+        self.offset = offset + 1
+        return INT8.unpack_from(self.data, offset)[0]
 
     def readUInt8(self):
-        return struct.unpack("<B", self.data.read(1))[0]
+        offset = self.offset
+        self.offset = offset + 1
+        return UINT8.unpack_from(self.data, offset)[0]
 
     def readInt32(self):
-        return struct.unpack("<l", self.data.read(4))[0]
+        offset = self.offset
+        self.offset = offset + 4
+        return INT32.unpack_from(self.data, offset)[0]
 
     def readUInt32(self):
-        return struct.unpack("<L", self.data.read(4))[0]
+        offset = self.offset
+        self.offset = offset + 4
+        return UINT32.unpack_from(self.data, offset)[0]
 
     def readInt64(self):
-        return struct.unpack("<q", self.data.read(8))[0]
+        offset = self.offset
+        self.offset = offset + 8
+        return INT64.unpack_from(self.data, offset)[0]
 
     def readUInt64(self):
-        return struct.unpack("<Q", self.data.read(8))[0]
+        offset = self.offset
+        self.offset = offset + 8
+        return UINT64.unpack_from(self.data, offset)[0]
 
     def readFloat(self):
-        return struct.unpack("<f", self.data.read(4))[0]
+        offset = self.offset
+        self.offset = offset + 4
+        return FLOAT.unpack_from(self.data, offset)[0]
 
     def readString(self, size):
         if size < 0:
-            string = self.data.read(-2*size).decode(encoding='UTF-16')
+            string = str(self.data[self.offset:self.offset-2*size], 'UTF-16')
+            self.offset -= 2*size
         else:
-            string = self.data.read(size).decode()
+            string = str(self.data[self.offset:self.offset+size], 'UTF-8')
+            self.offset += size
         return string[:-1]
 
     def readSHA(self):
-        sha = self.data.read(0x20).decode()
-        assert self.data.read(1) == b'\x00'
+        sha = str(self.data[self.offset:self.offset+0x20], 'UTF-8')
+        self.offset += 0x20
+        assert self.read(1) == b'\x00'
         return sha
 
 
-class FloatProperty(TYPE):
+class FloatProperty(PROPERTY):
+    __slots__ = ('_value',)
+    dataType = 'FloatProperty'
+    layout = FLOAT
+    valueOffset = 9
+    value = tracked('value')
+
     def __init__(self, file):
-        self.dataType = 'FloatProperty'
+        self.dirty = False
+        self.offset = file.tell()
         assert file.readInt64() == 4
-        file.data.seek(1, 1)
-        self.value = file.readFloat()
+        file.seek(1, 1)
+        self._value = file.readFloat()
 
     def build(self, uasset):
         tmp = self.getInt64(4)
@@ -104,12 +252,16 @@ class FloatProperty(TYPE):
         return tmp
 
 
-class StrProperty(TYPE):
+class StrProperty(PROPERTY):
+    __slots__ = ('_string',)
+    dataType = 'StrProperty'
+    string = tracked('string')
+
     def __init__(self, file):
-        self.dataType = 'StrProperty'
+        self.dirty = False
         size = file.readInt64()
-        file.data.seek(1, 1)
-        self.string = file.data.read(size)
+        file.seek(1, 1)
+        self._string = file.read(size)
         assert size == len(self.string)
 
     def build(self, uasset):
@@ -119,13 +271,25 @@ class StrProperty(TYPE):
         return tmp
 
 
-class EnumProperty(TYPE):
+class EnumProperty(PROPERTY):
+    __slots__ = ('_value0', '_value')
+    dataType = 'EnumProperty'
+    value0 = tracked('value0')
+    value = tracked('value')
+
     def __init__(self, file, uasset):
-        self.dataType = 'EnumProperty'
+        self.dirty = False
+        self.offset = file.tell()
         assert file.readInt64() == 8
-        self.value0 = uasset.getName(file.readInt64())
+        self._value0 = uasset.getName(file.readInt64())
         assert file.readInt8() == 0
-        self.value = uasset.getName(file.readInt64())
+        self._value = uasset.getName(file.readInt64())
+
+    def patch(self, data, uasset):
+        if self.dirty:
+            INT64.pack_into(data, self.offset + 8, uasset.getIndex(self.value0))
+            INT64.pack_into(data, self.offset + 17, uasset.getIndex(self.value))
+        return True
 
     def build(self, uasset):
         tmp = self.getInt64(8)
@@ -135,12 +299,19 @@ class EnumProperty(TYPE):
         return tmp
 
 
-class BoolProperty(TYPE):
+class BoolProperty(PROPERTY):
+    __slots__ = ('_value',)
+    dataType = 'BoolProperty'
+    layout = INT8
+    valueOffset = 8
+    value = tracked('value')
+
     def __init__(self, file):
-        self.dataType = 'BoolProperty'
+        self.dirty = False
+        self.offset = file.tell()
         assert file.readInt64() == 0
-        self.value = file.readInt8()
-        file.data.seek(1, 1)
+        self._value = file.readInt8()
+        file.seek(1, 1)
 
     def build(self, uasset):
         tmp = bytearray([0]*8)
@@ -149,12 +320,22 @@ class BoolProperty(TYPE):
         return tmp
 
 
-class NameProperty(TYPE):
+class NameProperty(PROPERTY):
+    __slots__ = ('_name',)
+    dataType = 'NameProperty'
+    name = tracked('name')
+
     def __init__(self, file, uasset):
-        self.dataType = 'NameProperty'
+        self.dirty = False
+        self.offset = file.tell()
         assert file.readInt64() == 8
-        file.data.seek(1, 1)
-        self.name = uasset.getName(file.readInt64())
+        file.seek(1, 1)
+        self._name = uasset.getName(file.readInt64())
+
+    def patch(self, data, uasset):
+        if self.dirty:
+            INT64.pack_into(data, self.offset + 9, uasset.getIndex(self.name))
+        return True
 
     def build(self, uasset):
         tmp = self.getInt64(8)
@@ -163,12 +344,19 @@ class NameProperty(TYPE):
         return tmp
 
 
-class IntProperty(TYPE):
+class IntProperty(PROPERTY):
+    __slots__ = ('_value',)
+    dataType = 'IntProperty'
+    layout = INT32
+    valueOffset = 9
+    value = tracked('value')
+
     def __init__(self, file):
-        self.dataType = 'IntProperty'
+        self.dirty = False
+        self.offset = file.tell()
         assert file.readInt64() == 4
-        file.data.seek(1, 1)
-        self.value = file.readInt32()
+        file.seek(1, 1)
+        self._value = file.readInt32()
 
     def build(self, uasset):
         tmp = self.getInt64(4)
@@ -177,12 +365,19 @@ class IntProperty(TYPE):
         return tmp
 
 
-class UInt32Property(TYPE):
+class UInt32Property(PROPERTY):
+    __slots__ = ('_value',)
+    dataType = 'UInt32Property'
+    layout = UINT32
+    valueOffset = 9
+    value = tracked('value')
+
     def __init__(self, file):
-        self.dataType = 'UInt32Property'
+        self.dirty = False
+        self.offset = file.tell()
         assert file.readInt64() == 4
-        file.data.seek(1, 1)
-        self.value = file.readUInt32()
+        file.seek(1, 1)
+        self._value = file.readUInt32()
 
     def build(self, uasset):
         tmp = self.getInt64(4)
@@ -191,13 +386,25 @@ class UInt32Property(TYPE):
         return tmp
 
 
-class ByteProperty(TYPE):
+class ByteProperty(PROPERTY):
+    __slots__ = ('_none', '_value')
+    dataType = 'ByteProperty'
+    none = tracked('none')
+    value = tracked('value')
+
     def __init__(self, file):
-        self.dataType = 'ByteProperty'
+        self.dirty = False
+        self.offset = file.tell()
         assert file.readInt64() == 1
-        self.none = file.readInt64()
-        file.data.seek(1, 1)
-        self.value = file.readInt8()
+        self._none = file.readInt64()
+        file.seek(1, 1)
+        self._value = file.readInt8()
+
+    def patch(self, data, uasset):
+        if self.dirty:
+            INT64.pack_into(data, self.offset + 8, self.none)
+            INT8.pack_into(data, self.offset + 17, self.value)
+        return True
 
     def build(self, uasset):
         tmp = self.getInt64(1)
@@ -207,12 +414,25 @@ class ByteProperty(TYPE):
         return tmp
 
 
-class SoftObjectProperty(TYPE):
+class SoftObjectProperty(PROPERTY):
+    __slots__ = ('_asset',)
+    dataType = 'SoftObjectProperty'
+    asset = tracked('asset')
+
     def __init__(self, file):
-        self.dataType = 'SoftObjectProperty'
+        self.dirty = False
+        self.offset = file.tell()
         assert file.readInt64() == 0xc
-        file.data.seek(1, 1)
-        self.asset = file.data.read(0xc)
+        file.seek(1, 1)
+        self._asset = file.read(0xc)
+
+    def patch(self, data, uasset):
+        if not self.dirty:
+            return True
+        if len(self.asset) != 0xc:
+            return False
+        data[self.offset+9:self.offset+9+0xc] = self.asset
+        return True
 
     def build(self, uasset):
         tmp = self.getInt64(0xc)
@@ -223,26 +443,60 @@ class SoftObjectProperty(TYPE):
 
 # MonsterDataAsset: Include a bunch of floats I won't need to modify.
 # Just lost struct as a bytearray
-class StructProperty(TYPE):
+class StructProperty(PROPERTY):
+    __slots__ = ('none', 'callbackBuild', '_structSize', '_structType', '_x', '_y', '_z', '_r', '_g', '_b', '_a', '_structData')
+    dataType = 'StructProperty'
+    structSize = tracked('structSize')
+    structType = tracked('structType')
+    x = tracked('x')
+    y = tracked('y')
+    z = tracked('z')
+    r = tracked('r')
+    g = tracked('g')
+    b = tracked('b')
+    a = tracked('a')
+    structData = tracked('structData')
+
     def __init__(self, file, uasset, callbackLoad, callbackBuild):
+        self.dirty = False
+        self.offset = file.tell()
         self.none = uasset.getIndex('None')
         self.callbackBuild = callbackBuild
-        self.dataType = 'StructProperty'
-        self.structSize = file.readInt64()
-        self.structType = uasset.getName(file.readInt64())
-        file.data.seek(17, 1)
-        # self.structData = file.data.read(self.size)
+        self._structSize = file.readInt64()
+        self._structType = uasset.getName(file.readInt64())
+        file.seek(17, 1)
+        # self._structData = file.read(self.size)
         if self.structType == 'Vector':
-            self.x = file.readInt32()
-            self.y = file.readInt32()
-            self.z = file.readInt32()
+            self._x = file.readInt32()
+            self._y = file.readInt32()
+            self._z = file.readInt32()
         elif self.structType == 'LinearColor':
-            self.r = file.readFloat()
-            self.g = file.readFloat()
-            self.b = file.readFloat()
-            self.a = file.readFloat()
+            self._r = file.readFloat()
+            self._g = file.readFloat()
+            self._b = file.readFloat()
+            self._a = file.readFloat()
         else:
-            self.structData = callbackLoad()
+            self._structData = callbackLoad()
+
+    def isDirty(self):
+        if self.dirty:
+            return True
+        if self.structType == 'Vector' or self.structType == 'LinearColor':
+            return False
+        return self.structData.isDirty()
+
+    def patch(self, data, uasset):
+        if self.structType == 'Vector':
+            if self.dirty:
+                for i, value in enumerate([self.x, self.y, self.z]):
+                    INT32.pack_into(data, self.offset + 33 + 4*i, value)
+            return True
+        if self.structType == 'LinearColor':
+            if self.dirty:
+                for i, value in enumerate([self.r, self.g, self.b, self.a]):
+                    FLOAT.pack_into(data, self.offset + 33 + 4*i, value)
+            return True
+        return not self.dirty and self.structData.patch(data, uasset)
 
     def build(self, uasset):
         if self.structType == 'Vector':
@@ -272,23 +526,53 @@ class StructProperty(TYPE):
         return tmp + tmp2
 
 
-class TextProperty(TYPE):
+# Tracked attribute that is decoded from the raw data on first access
+def decoded(name):
+    key = '_' + name
+    value = tracked(name)
+    def getValue(self):
+        if self._string is None:
+            self.decode()
+        return getattr(self, key)
+    def setValue(self, v):
+        if self._string is None:
+            self.decode()
+        value.fset(self, v)
+    return property(getValue, setValue)
+
+
+class TextProperty(PROPERTY):
+    __slots__ = ('size', 'raw', '_namespace', '_sha', '_string')
+    dataType = 'TextProperty'
+    namespace = decoded('namespace')
+    sha = decoded('sha')
+    string = decoded('string')
+
     def __init__(self, file):
-        self.dataType = 'TextProperty'
+        self.dirty = False
         self.size = file.readInt64()
-        file.data.seek(5, 1)
+        file.seek(1, 1)
+        self.raw = file.read(self.size) # Reused as is unless modified
+        self._string = None
+
+    def decode(self):
+        file = FILE(self.raw)
+        file.seek(4)
         if file.readInt8() == -1:
             assert file.readInt32() == 0
-            self.string = ''
+            self._string = ''
         else:
             size = file.readInt32()
-            self.namespace = file.readString(size)
+            self._namespace = file.readString(size)
             assert file.readInt32() == 0x21
-            self.sha = file.readSHA()
+            self._sha = file.readSHA()
             size = file.readInt32()
-            self.string = file.readString(size)
+            self._string = file.readString(size)
 
     def build(self, uasset):
+        if not self.dirty:
+            return self.getInt64(self.size) + bytearray([0]) + self.raw
+
         tmp = bytearray([0]*4)
         if not self.string:
             tmp += bytearray([0xff]+[0]*4)
@@ -306,40 +590,140 @@ class TextProperty(TYPE):
         return self.getInt64(size) + bytearray([0]) + tmp
 
 
-class ArrayProperty(TYPE):
+# Elements of an EnumProperty array, kept as name indices of the uasset
+# and only decoded to names when accessed
+class ENUMARRAY(MutableSequence):
+    def __init__(self, uasset, indices):
+        self.uasset = uasset
+        self.indices = indices
+
+    @classmethod
+    def fromNames(cls, uasset, names):
+        return cls(uasset, array('q', map(uasset.getIndex, names)))
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return list(map(self.uasset.getName, self.indices[i]))
+        return self.uasset.getName(self.indices[i])
+
+    def __setitem__(self, i, name):
+        if isinstance(i, slice):
+            self.indices[i] = array('q', map(self.uasset.getIndex, name))
+        else:
+            self.indices[i] = self.uasset.getIndex(name)
+
+    def __delitem__(self, i):
+        del self.indices[i]
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __iter__(self):
+        return map(self.uasset.getName, self.indices)
+
+    def __eq__(self, other):
+        if isinstance(other, ENUMARRAY):
+            return self.uasset is other.uasset and self.indices == other.indices
+        return list(self) == other
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def insert(self, i, name):
+        self.indices.insert(i, self.uasset.getIndex(name))
+
+    # Indices in another uasset
+    def getIndices(self, uasset):
+        if uasset is self.uasset:
+            return self.indices
+        return array('q', map(uasset.getIndex, self))
+
+    # The uasset is shared rather than copied
+    def __copy__(self):
+        return ENUMARRAY(self.uasset, array('q', self.indices))
+
+    def __deepcopy__(self, memo):
+        return self.__copy__()
+
+
+class ArrayProperty(PROPERTY):
+    __slots__ = ('none', 'uasset', 'callbackBuild', 'size', '_prop', '_name', '_structSize', '_structType', '_array', 'original')
+    dataType = 'ArrayProperty'
+    prop = tracked('prop')
+    name = tracked('name')
+    structSize = tracked('structSize')
+    structType = tracked('structType')
+
     def __init__(self, file, uasset, callbackLoad, callbackBuild):
+        self.dirty = False
+        self.offset = file.tell()
         self.none = uasset.getIndex('None')
+        self.uasset = uasset
         self.callbackBuild = callbackBuild
-        self.dataType = 'ArrayProperty'
         self.size = file.readInt64()
-        self.prop = uasset.getName(file.readInt64())
-        file.data.seek(1, 1)
+        self._prop = uasset.getName(file.readInt64())
+        file.seek(1, 1)
         num = file.readInt32()
-        self.array = []
 
         if self.prop == 'IntProperty':
             assert self.size == 4 + 4*num
-            for _ in range(num):
-                self.array.append(file.readInt32())
-            return
+            self._array = array('i', file.read(4*num))
+        elif self.prop == 'EnumProperty':
+            assert self.size == 4 + 8*num
+            self._array = ENUMARRAY(uasset, array('q', file.read(8*num)))
+        elif self.prop == 'StructProperty':
+            self._name = uasset.getName(file.readInt64())
+            assert uasset.getName(file.readInt64()) == 'StructProperty'
+            self._structSize = file.readInt64()
+            self._structType = uasset.getName(file.readInt64())
+            file.seek(17, 1)
+            self._array = [callbackLoad() for _ in range(num)]
+        else:
+            sys.exit(f"Load array property does not allow for {self.prop} types!")
 
+        # Compared with to find in place changes
+        if self.prop == 'StructProperty':
+            self.original = list(self._array)
+        elif self.prop == 'EnumProperty':
+            self.original = array('q', self._array.indices)
+        else:
+            self.original = array('i', self._array)
+
+    # Lists assigned to int and enum arrays are packed
+    @property
+    def array(self):
+        return self._array
+
+    @array.setter
+    def array(self, values):
+        if self.prop == 'IntProperty' and not (isinstance(values, array) and values.typecode == 'i'):
+            values = array('i', values)
+        elif self.prop == 'EnumProperty' and not isinstance(values, ENUMARRAY):
+            values = ENUMARRAY.fromNames(self.uasset, values)
+        self._array = values
+
+    def getPacked(self):
         if self.prop == 'EnumProperty':
-            assert self.size == 4 + 8*num
-            for _ in range(num):
-                self.array.append(uasset.getName(file.readInt64()))
-            return
+            return self.array.getIndices(self.uasset)
+        return self.array
 
+    def isDirty(self):
+        if self.dirty or len(self.array) != len(self.original):
+            return True
         if self.prop == 'StructProperty':
-            self.name = uasset.getName(file.readInt64())
-            assert uasset.getName(file.readInt64()) == 'StructProperty'
-            self.structSize = file.readInt64()
-            self.structType = uasset.getName(file.readInt64())
-            file.data.seek(17, 1)
-            for _ in range(num):
-                self.array.append(callbackLoad())
-            return
+            return any(a is not b or a.isDirty() for a, b in zip(self.array, self.original))
+        return self.getPacked() != self.original
 
-        sys.exit(f"Load array property does not allow for {prop} types!")
+    def patch(self, data, uasset):
+        if self.dirty or len(self.array) != len(self.original):
+            return False
+        if self.prop == 'StructProperty':
+            return all(a is b and a.patch(data, uasset) for a, b in zip(self.array, self.original))
+        packed = self.getPacked()
+        if packed != self.original:
+            start = self.offset + 21
+            data[start:start+self.size-4] = packed.tobytes()
+        return True
 
     def build(self, uasset):
         none = uasset.getIndex('None')
@@ -348,11 +732,9 @@ class ArrayProperty(TYPE):
 
         tmp2 = self.getInt32(len(self.array))
         if self.prop == 'IntProperty':
-            for ai in self.array:
-                tmp2 += self.getInt32(ai)
+            tmp2 += self.array.tobytes()
         elif self.prop == 'EnumProperty':
-            for ai in self.array:
-                tmp2 += self.getInt64(uasset.getIndex(ai))
+            tmp2 += self.array.getIndices(uasset).tobytes()
         elif self.prop == 'StructProperty':
             tmp2 += self.getInt64(uasset.getIndex(self.name))
             tmp2 += self.getInt64(uasset.getIndex('StructProperty'))
@@ -376,34 +758,35 @@ class UASSET(FILE):
         self.entries = {}
         self.idxToName = {}
         self.nameToIdx = {}
+        self.suffixToIdx = {} # e.g. Name_1
 
-        self.data.seek(0x75)
+        self.seek(0x75)
         count = self.readInt32()
-        self.data.seek(0xbd)
+        self.seek(0xbd)
         self.addrUexp = self.readInt32() - 0x54
-        self.data.seek(self.addrUexp)
+        self.seek(self.addrUexp)
         self.size1 = self.readInt64()
-        self.data.seek(0xa9)
+        self.seek(0xa9)
         self.size2 = self.readInt64()
         # Store header
-        self.data.seek(0)
-        self.header = bytearray(self.data.read(0xc1))
+        self.seek(0)
+        self.header = bytearray(self.read(0xc1))
         # Load names
-        self.data.seek(0xc1)
+        self.seek(0xc1)
         for i in range(count):
-            base = self.data.tell()
+            base = self.tell()
             size = self.readInt32()
             name = self.readString(size)
             key = self.readInt32()
             self.nameToIdx[name] = i
             self.idxToName[i] = name
             # Store chunk of data 
-            size = self.data.tell() - base
-            self.data.seek(base)
-            self.entries[name] = bytearray(self.data.read(size))
+            size = self.tell() - base
+            self.seek(base)
+            self.entries[name] = bytearray(self.read(size))
         # Store footers (not sure what they're used for)
-        # self.addrUexp = addrUexp - self.data.tell()
-        self.footer = bytearray(self.data.read())
+        # self.addrUexp = addrUexp - self.tell()
+        self.footer = bytearray(self.read())
 
     def build(self):
         data = bytearray([])
@@ -421,26 +804,309 @@ class UASSET(FILE):
     def getIndex(self, name):
         if name in self.nameToIdx:
             return self.nameToIdx[name]
+        if name in self.suffixToIdx:
+            return self.suffixToIdx[name]
         nameBase = '_'.join(name.split('_')[:-1])
         if nameBase not in self.nameToIdx:
             sys.exit(f"{nameBase} does not exist in this uasset")
         value = int(name.split('_')[-1]) + 1
         value <<= 32
         value += self.nameToIdx[nameBase]
+        self.suffixToIdx[name] = value
         return value
 
 
+# Properties of an entry; flags any that get replaced, added, or removed
+class ENTRY(dict):
+    dirty = False
+
+    def __setitem__(self, key, value):
+        if self.get(key) is not value:
+            self.dirty = True
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.dirty = True
+        super().__delitem__(key)
+
+    def pop(self, *args):
+        self.dirty = True
+        return super().pop(*args)
+
+    def popitem(self):
+        self.dirty = True
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.dirty = True
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        self.dirty = True
+        super().update(*args, **kwargs)
+
+    def clear(self):
+        self.dirty = True
+        super().clear()
+
+    def isDirty(self):
+        return self.dirty or any(prop.isDirty() for prop in self.values())
+
+    def patch(self, data, uasset):
+        return not self.dirty and all(prop.patch(data, uasset) for prop in self.values())
+
+
+# Map entries along with their original byte spans.
+# Lazy tables store only the spans until an entry is first accessed.
+class TABLE(MutableMapping):
+    dirty = False
+    layout = None
+
+    def __init__(self, callbackLoad):
+        self.callbackLoad = callbackLoad
+        self.entries = {}
+        self.spans = {}
+
+    def addEntry(self, key, entry, start, end):
+        self.entries[key] = entry
+        self.spans[key] = (start, end)
+
+    # Bytes of an entry that can be reused as is (after patching it in place),
+    # including its terminating None
+    def getRaw(self, key, data, uasset):
+        if key not in self.spans:
+            return
+        entry = self.entries[key]
+        if entry is None or entry.patch(data, uasset):
+            start, end = self.spans[key]
+            return data[start:end]
+
+    def isDirty(self):
+        if self.dirty:
+            return True
+        return any(entry is not None and entry.isDirty() for entry in self.entries.values())
+
+    def patch(self, data, uasset):
+        if self.dirty:
+            return False
+        return all(entry is None or entry.patch(data, uasset) for entry in self.entries.values())
+
+    def __getitem__(self, key):
+        entry = self.entries[key]
+        if entry is None:
+            entry = self.callbackLoad(self, self.spans[key][0])
+            self.entries[key] = entry
+        return entry
+
+    def __setitem__(self, key, entry):
+        if self.entries.get(key) is not entry:
+            self.dirty = True
+            self.spans.pop(key, None)
+        self.entries[key] = entry
+
+    def __delitem__(self, key):
+        self.dirty = True
+        del self.entries[key]
+        self.spans.pop(key, None)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+
+# One numpy array per numeric property of a map, rows ordered as in ids.
+# Changed values are written back to the properties by sync (called in update).
+class COLUMNS:
+    def __init__(self, table, fields=None):
+        try:
+            import numpy as np
+        except ImportError:
+            sys.exit('numpy is required for column views')
+        self.table = table
+        self.ids = list(table)
+        self.rows = {key: i for i, key in enumerate(self.ids)}
+        entries = [table[key] for key in self.ids]
+        if fields is None:
+            fields = list(entries[0]) if entries else []
+        self.columns = {}
+        for field in fields:
+            props = [entry.get(field) for entry in entries]
+            dataTypes = set(type(prop).dataType if prop is not None else None for prop in props)
+            if len(dataTypes) != 1 or not dataTypes.issubset(NUMERIC_PROPERTIES):
+                continue
+            dtype = NUMERIC_PROPERTIES[dataTypes.pop()]
+            self.columns[field] = np.fromiter(map(attrgetter('value'), props), dtype=dtype, count=len(props))
+        self.original = {field: column.copy() for field, column in self.columns.items()}
+
+    def __getitem__(self, field):
+        return self.columns[field]
+
+    def __setitem__(self, field, values):
+        self.columns[field][:] = values
+
+    def __contains__(self, field):
+        return field in self.columns
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def row(self, key):
+        i = self.rows[key]
+        return {field: column[i].item() for field, column in self.columns.items()}
+
+    # Only values that differ from the last sync are written back,
+    # so edits made directly to the properties are kept
+    def sync(self):
+        for field, column in self.columns.items():
+            original = self.original[field]
+            for i in (column != original).nonzero()[0]:
+                self.table[self.ids[i]][field].value = column[i].item()
+            original[:] = column
+
+
+# Parser and builder specialised to the properties of a map's first entry.
+# Runs of fixed width properties are read and written with a single struct.
+# Entries that don't fit the layout fall back to loadEntry/buildEntry.
+class LAYOUT:
+    def __init__(self, data, entry):
+        self.none = data.none
+        self.uasset = data.uasset
+        self.keys = tuple(entry)
+        self.types = tuple(map(type, entry.values()))
+        self.structTypes = tuple(getattr(prop, 'structType', None) for prop in entry.values())
+        self.steps = []
+
+        segment = []
+        for key, prop in entry.items():
+            header = (data.uasset.getIndex(key), data.uasset.getIndex(prop.dataType))
+            name = prop.structType if prop.dataType == 'StructProperty' else prop.dataType
+            if name in FIXED_PROPERTIES:
+                segment.append((key, prop, header, FIXED_PROPERTIES[name]))
+                continue
+            self.addSegment(segment)
+            segment = []
+            self.steps.append((False, key, header, INT64.pack(header[0]) + INT64.pack(header[1]), data.switcher[prop.dataType]))
+        self.addSegment(segment)
+
+    def addSegment(self, segment):
+        if not segment:
+            return
+        fmt = '<'
+        first = 0 # Index of the property's first field
+        constants = {}
+        columns = []
+        for key, prop, header, (propFmt, propConstants, fields) in segment:
+            delta = struct.calcsize(fmt) + 16 # offset of the size
+            constants[first] = header[0]
+            constants[first+1] = header[1]
+            for i, value in propConstants.items():
+                constants[first+2+i] = value
+            extras = []
+            if prop.dataType == 'StructProperty':
+                extras = [('none', self.none), ('callbackBuild', prop.callbackBuild)]
+                constants[first+2] = prop.structSize
+                constants[first+3] = self.uasset.getIndex(prop.structType)
+            fields = [(slot, first+2+i, isName) for slot, i, isName in fields]
+            columns.append((key, type(prop), delta, fields, extras))
+            fmt += 'qq' + propFmt
+            first += 2 + len(struct.unpack('<' + propFmt, bytes(struct.calcsize('<' + propFmt))))
+        layout = struct.Struct(fmt)
+        indices = sorted(constants)
+        getConstants = itemgetter(*indices) # Always at least the header
+        expected = tuple(constants[i] for i in indices)
+        template = [0] * first
+        for i, value in constants.items():
+            template[i] = value
+        self.steps.append((True, layout, getConstants, expected, columns, template))
+
+    # Returns None if the entry doesn't match, leaving the file where it was
+    def load(self, file):
+        view = file.data
+        start = offset = file.offset
+        getName = self.uasset.getName
+        new = object.__new__
+        dic = {}
+        try:
+            for step in self.steps:
+                if step[0]:
+                    _, layout, getConstants, expected, columns, _ = step
+                    values = layout.unpack_from(view, offset)
+                    if getConstants(values) != expected:
+                        file.seek(start)
+                        return
+                    for key, cls, delta, fields, extras in columns:
+                        prop = new(cls)
+                        prop.dirty = False
+                        prop.offset = offset + delta
+                        for slot, i, isName in fields:
+                            setattr(prop, slot, getName(values[i]) if isName else values[i])
+                        for slot, value in extras:
+                            setattr(prop, slot, value)
+                        dic[key] = prop
+                    offset += layout.size
+                else:
+                    _, key, header, _, load = step
+                    if HEADER.unpack_from(view, offset) != header:
+                        file.seek(start)
+                        return
+                    file.seek(offset + 16)
+                    dic[key] = load()
+                    offset = file.offset
+            if INT64.unpack_from(view, offset)[0] != self.none:
+                file.seek(start)
+                return
+        except struct.error:
+            file.seek(start)
+            return
+        file.seek(offset + 8)
+        return ENTRY(dic)
+
+    # Returns None if the entry doesn't match
+    def build(self, entry):
+        if tuple(entry) != self.keys or tuple(map(type, entry.values())) != self.types:
+            return
+        props = list(entry.values())
+        if any(prop.structType != structType for prop, structType in zip(props, self.structTypes) if structType):
+            return
+        getIndex = self.uasset.getIndex
+        data = bytearray([])
+        props = iter(props)
+        for step in self.steps:
+            if step[0]:
+                _, layout, _, _, columns, template = step
+                values = list(template)
+                for _, _, _, fields, _ in columns:
+                    prop = next(props)
+                    for slot, i, isName in fields:
+                        value = getattr(prop, slot)
+                        values[i] = getIndex(value) if isName else value
+                data += layout.pack(*values)
+            else:
+                data += step[3]
+                data += next(props).build(self.uasset)
+        return data
+
+
 # NB: This is written specifically for the files used.
 class DATA:
-    def __init__(self, rom, fileName):
+    def __init__(self, rom, fileName, lazy=False):
         self.rom = rom
         self.fileName = fileName
+        self.lazy = lazy
         print(f'Loading data from {fileName}')
         # Load data
         self.uasset = UASSET(self.rom.extractFile(f"{self.fileName}.uasset"))
         self.uexp = FILE(self.rom.extractFile(f"{self.fileName}.uexp"))
         # Store none index
         self.none = self.uasset.getIndex('None')
+        self.headers = {}
+        self.columns = []
         # Organize/"parse" uexp data
         self.switcher = {  # REPLACE WITH MATCH IN py3.10????
             'EnumProperty': partial(EnumProperty, self.uexp, self.uasset),
@@ -458,20 +1124,18 @@ class DATA:
         }
         self.loadTable()
 
-    def buildTable(self):
+    # Unchanged entries are copied from original, patched in place as needed
+    def buildTable(self, original):
         data = bytearray([])
         for name in self.table:
-            index = self.uasset.getIndex(name)
-            data += self.uexp.getInt64(index)
             prop = self.table[name]['prop']
-            data += self.uexp.getInt64(self.uasset.getIndex(prop))
+            data += self.getHeader(name, prop)
             if prop == 'ArrayProperty':
                 data += self.table[name]['data'].build(self.uasset)
             if prop == 'IntProperty':
                 data += self.table[name]['data'].build(self.uasset)
             elif prop == 'MapProperty':
-                tmp1 = self.uexp.getInt64(self.uasset.getIndex(self.table[name]['type']))
-                tmp1 += self.uexp.getInt64(self.uasset.getIndex('StructProperty'))
+                tmp1 = self.getHeader(self.table[name]['type'], 'StructProperty')
                 tmp1 += bytearray([0])
 
                 tmp2 = bytearray([0]*4)
@@ -482,7 +1146,11 @@ class DATA:
                         tmp2 += self.uexp.getInt32(key)
                     else: # EnumProperty, NameProperty
                         tmp2 += self.uexp.getInt64(self.uasset.getIndex(key))
-                    tmp2 += self.buildEntry(table[key])
+                    raw = table.getRaw(key, original, self.uasset)
+                    if raw is not None:
+                        tmp2 += raw
+                        continue
+                    tmp2 += self.buildMapEntry(table, table[key])
                     tmp2 += self.uexp.getInt64(self.none)
                 tmp = self.uexp.getInt64(len(tmp2))
                 data += tmp + tmp1 + tmp2
@@ -492,11 +1160,20 @@ class DATA:
         data += bytearray([0xc1, 0x83, 0x2a, 0x9e])
         return data
 
+    # Name and type indices preceding a property
+    def getHeader(self, key, dataType):
+        try:
+            return self.headers[(key, dataType)]
+        except KeyError:
+            header = self.uexp.getInt64(self.uasset.getIndex(key))
+            header += self.uexp.getInt64(self.uasset.getIndex(dataType))
+            self.headers[(key, dataType)] = header
+            return header
+
     def buildEntry(self, entry):
         data = bytearray([])
         for key, d in entry.items():
-            data += self.uexp.getInt64(self.uasset.getIndex(key))
-            data += self.uexp.getInt64(self.uasset.getIndex(d.dataType))
+            data += self.getHeader(key, d.dataType)
             data += d.build(self.uasset)
         return data
 
@@ -511,7 +1188,58 @@ class DATA:
             except KeyError:
                 sys.exit(f"{prop} not yet included")
             nextValue = self.uexp.readInt64()
-        return dic
+        return ENTRY(dic)
+
+    def loadEntryAt(self, table, offset):
+        self.uexp.seek(offset)
+        return self.loadMapEntry(table)
+
+    # Entries of a map share their properties, so learn them from the first one
+    def loadMapEntry(self, table):
+        if table.layout:
+            entry = table.layout.load(self.uexp)
+            if entry is not None:
+                return entry
+        entry = self.loadEntry()
+        if table.layout is None:
+            table.layout = LAYOUT(self, entry) if entry else False
+        return entry
+
+    def buildMapEntry(self, table, entry):
+        if table.layout:
+            data = table.layout.build(entry)
+            if data is not None:
+                return data
+        return self.buildEntry(entry)
+
+    # Find the end of an entry without loading any of its properties
+    def skipEntry(self):
+        nextValue = self.uexp.readInt64()
+        while nextValue != self.none:
+            prop = self.uasset.getName(self.uexp.readInt64())
+            size = self.uexp.readInt64()
+            try:
+                self.uexp.seek(PROPERTY_PADDING[prop] + size, 1)
+            except KeyError:
+                sys.exit(f"{prop} not yet included")
+            nextValue = self.uexp.readInt64()
+
+    # Read one property of a map entry; lazy entries stay unloaded
+    def loadProperty(self, table, key, name):
+        if table.entries[key] is not None:
+            return table[key].get(name)
+        self.uexp.seek(table.spans[key][0])
+        nextValue = self.uexp.readInt64()
+        while nextValue != self.none:
+            prop = self.uasset.getName(self.uexp.readInt64())
+            if self.uasset.getName(nextValue) == name:
+                return self.switcher[prop]()
+            size = self.uexp.readInt64()
+            try:
+                self.uexp.seek(PROPERTY_PADDING[prop] + size, 1)
+            except KeyError:
+                sys.exit(f"{prop} not yet included")
+            nextValue = self.uexp.readInt64()
 
     def loadTable(self):
         self.table = {}
@@ -534,9 +1262,9 @@ class DATA:
                 assert dataType == 'EnumProperty' or dataType == 'IntProperty' or dataType == 'NameProperty'
                 assert self.uasset.getName(self.uexp.readInt64()) == 'StructProperty'
                 self.table[name]['type'] = dataType
-                self.uexp.data.seek(5, 1)
+                self.uexp.seek(5, 1)
                 numEntries = self.uexp.readInt32()
-                self.table[name]['data'] = {}
+                self.table[name]['data'] = TABLE(self.loadEntryAt)
                 for _ in range(numEntries): # one entry per job
                     if dataType == 'EnumProperty':
                         key = self.uasset.getName(self.uexp.readInt64())
@@ -546,14 +1274,40 @@ class DATA:
                         key = self.uasset.getName(self.uexp.readInt64())
                     else:
                         sys.exit(f"loadTable MapProperty not setup for {dataType}")
-                    self.table[name]['data'][key] = self.loadEntry()
+                    start = self.uexp.tell()
+                    if self.lazy:
+                        self.skipEntry()
+                        entry = None
+                    else:
+                        entry = self.loadMapEntry(self.table[name]['data'])
+                    self.table[name]['data'].addEntry(key, entry, start, self.uexp.tell())
             else:
                 sys.exit(f"loadTable not setup for {propName}")
             nextValue = self.uexp.readInt64()
 
+    # Numeric columns of a map's entries, written back on update
+    def getColumns(self, name, fields=None):
+        assert self.table[name]['prop'] == 'MapProperty'
+        columns = COLUMNS(self.table[name]['data'], fields)
+        self.columns.append(columns)
+        return columns
+
+    def isDirty(self):
+        return any(item['data'].isDirty() for item in self.table.values())
+
+    def patch(self, data):
+        return all(item['data'].patch(data, self.uasset) for item in self.table.values())
+
     def update(self):
-        # Build uexp
-        dataUEXP = self.buildTable()
+        for columns in self.columns:
+            columns.sync()
+        # Nothing to patch
+        if not self.isDirty():
+            return
+        # Only rebuild the uexp when changes can't be made in place
+        dataUEXP = bytearray(self.uexp.data)
+        if not self.patch(dataUEXP):
+            dataUEXP = self.buildTable(dataUEXP)
         # Build uasset
         dataUASSET = self.uasset.build()
         # Update sizes in uasset
@@ -1,12 +1,11 @@
 from dataclasses import dataclass, field
-import hjson
 import sys
 import random
 import struct
 import io
 from Classes import DATA
 from ClassData import ITEMASSET, ACTIONSKILL, SUPPORTSKILL, ITEM, ITEMENEMY, CHEST, QUESTREWARD, DROP, STEAL, MAGIC, WEAPONS, EFFECTS, JOB, STATS, AFFINITY, BOSSAI
-from Utilities import get_filename
+from Utilities import load_json
 from copy import deepcopy
 
 
@@ -37,30 +36,68 @@ jobNames= {
     'EJobEnum::JE_Brave': 'Bravebearer',
 }
 
+# Names and IDs shared by the assets of a MOD, filled in as they load.
+# Names are kept per namespace (e.g. 'item', 'action') since IDs of
+# different kinds can share a name. Within a namespace a name keeps every
+# ID registered under it, in order. References map an ID to the
+# (asset, row) pairs that use it.
+class REGISTRY:
+    def __init__(self):
+        self.idToName = {}
+        self.nameToIds = {}
+        self.references = {}
+
+    def register(self, namespace, Id, name):
+        self.idToName.setdefault(namespace, {})[Id] = name
+        Ids = self.nameToIds.setdefault(namespace, {}).setdefault(name, [])
+        if Id not in Ids:
+            Ids.append(Id)
+
+    def getName(self, namespace, Id):
+        return self.idToName.get(namespace, {}).get(Id)
+
+    def getIds(self, namespace, name):
+        return self.nameToIds.get(namespace, {}).get(name, [])
+
+    def addReference(self, Id, asset, row):
+        self.references.setdefault(Id, []).append((asset, row))
+
+    def getReferences(self, Id, asset=None):
+        return [row for a, row in self.references.get(Id, []) if asset is None or a == asset]
+
+
 class ITEMDATA(DATA):
-    def __init__(self, rom, text):
+    def __init__(self, rom, text, registry):
         super().__init__(rom, 'ItemDataAsset')
         self.data = self.table['ConsumeItemDataMap']['data']
         self.text = text
+        self.registry = registry
 
         self.items = {}
+        names = set()
         for Id, item in self.data.items():
             name = self.text.getName(Id)
             if not name:
                 continue
-            if name in self.items:
+            if name in names:
                 print('Repeated name!')
                 sys.exit()
-            self.items[name] = ITEMASSET(
+            names.add(name)
+            self.registry.register('item', Id, name)
+            self.items[Id] = ITEMASSET(
                 Id,
                 name,
                 item['PurchasePrice'].value,
                 item['SellingPrice'].value,
             )
 
+    # Shops may register other IDs under the same name
     def zeroCost(self, name):
-        self.items[name].PurchasePrice = 0
-        self.items[name].SellingPrice = 0
+        Ids = [Id for Id in self.registry.getIds('item', name) if Id in self.items]
+        assert len(Ids) == 1, f"{name} is not an item"
+        item = self.items[Ids[0]]
+        item.PurchasePrice = 0
+        item.SellingPrice = 0
 
     def update(self):
         for item in self.items.values():
@@ -70,25 +107,30 @@ class ITEMDATA(DATA):
 
 
 class SHOPDATA:
-    def __init__(self, rom, text):
-        # Currently limited only to shops with hi-potions and ethers
-        self.indices = ['001', '101', '111', '121', '131', '141', '151', '201']
+    # Currently limited only to shops with hi-potions and ethers
+    indices = ['001', '101', '111', '121', '131', '141', '151', '201']
+
+    def __init__(self, rom, text, registry):
         self.data = {}
-        self.shops = {}
+        self.registry = registry
         for index in self.indices:
             fileName = f'ShopSalesListDataAsset_{index}'
-            self.data[index] = DATA(rom, fileName)
-            self.shops[index] = {}
-            for item in self.data[index].table['ShopSalesListDataMap']['data'].values():
-                name = text.getName(item['ItemId'].value)
+            self.data[index] = DATA(rom, fileName, lazy=True)
+            # Only the item of each row is read; rows load when modified
+            table = self.data[index].table['ShopSalesListDataMap']['data']
+            for key in table:
+                Id = self.data[index].loadProperty(table, key, 'ItemId').value
+                name = text.getName(Id)
                 if name is None:
                     continue
-                self.shops[index][name] = item
+                self.registry.register('item', Id, name)
+                self.registry.addReference(Id, 'shops', (table, key))
 
+    # Every shop row selling an item of that name
     def earlyAccess(self, name):
-        for shop in self.shops.values():
-            if name in shop:
-                shop[name]['Progress'].value = 0
+        for Id in self.registry.getIds('item', name):
+            for table, key in self.registry.getReferences(Id, 'shops'):
+                table[key]['Progress'].value = 0
 
     def update(self):
         for data in self.data.values():
@@ -196,8 +238,9 @@ class SUPPORT(DATA):
         
 
 class JOBDATA:
-    def __init__(self, rom, actions, support):
+    def __init__(self, rom, actions, support, registry):
         self.assets = DATA(rom, 'JobDataAsset')
+        self.registry = registry
         self.assetsTable = self.assets.table['JobDataMap']['data']
         self.actionsDict = {}
         self.supportDict = {}
@@ -230,11 +273,10 @@ class JOBDATA:
             self.jobs.append(job)
 
         # Store for easy skill id lookup
-        self.nameToId = {}
         for skill in self.actionsDict.values():
-            self.nameToId[skill.Name] = skill.Id
+            self.registry.register('action', skill.Id, skill.Name)
         for skill in self.supportDict.values():
-            self.nameToId[skill.Name] = skill.Id
+            self.registry.register('support', skill.Id, skill.Name)
 
     def update(self):
         for job in self.jobs:
@@ -245,13 +287,23 @@ class JOBDATA:
             data['JobTraitId2'].value = job.getTrait2()
         self.assets.update()
 
+    # Support skills take precedence over actions with the same name,
+    # and the last skill registered over earlier ones
+    def getId(self, name):
+        Ids = self.registry.getIds('support', name) or self.registry.getIds('action', name)
+        assert Ids, f"{name} is not a job skill"
+        return Ids[-1]
+
     def getIds(self, names):
-        return [self.nameToId[n] for n in names]
+        return [self.getId(n) for n in names]
 
     def pickIds(self, num, names):
         assert num <= len(names)
         count = random.randint(num, len(names))
-        return [self.nameToId[n] for n in random.sample(names, count)]
+        return [self.getId(n) for n in random.sample(names, count)]
+
+    def getAction(self, name):
+        return self.actionsDict[self.registry.getIds('action', name)[-1]]
 
     def pickGroup(self, groups):
         group = random.sample(groups, 1)[0]
@@ -407,12 +459,12 @@ class MONSTERPARTY(DATA):
                 self.levels[Id].add(Level)
 
         ### MUST LOAD DATA (TO BE UPDATED) FOR SHUFFLING ENEMIES IN JOB BATTLES
-        self.asterisks = hjson.load(open(get_filename('json/asterisks.json'), 'r')) # Battles where you earn an asterisk
-        self.tribulation = hjson.load(open(get_filename('json/tribulation.json'), 'r'))
-        self.rareMonsters = hjson.load(open(get_filename('json/rare_monsters.json'), 'r'))
-        self.questBosses = hjson.load(open(get_filename('json/quest_bosses.json'), 'r'))
-        self.bosses = hjson.load(open(get_filename('json/bosses.json'), 'r'))
-        self.nexus = hjson.load(open(get_filename('json/nexus.json'), 'r'))
+        self.asterisks = load_json('json/asterisks.json') # Battles where you earn an asterisk
+        self.tribulation = load_json('json/tribulation.json')
+        self.rareMonsters = load_json('json/rare_monsters.json')
+        self.questBosses = load_json('json/quest_bosses.json')
+        self.bosses = load_json('json/bosses.json')
+        self.nexus = load_json('json/nexus.json')
         # ENSURE NEXUS IS LAST FOR HALL REPEATS
         self.bossList = [self.asterisks, self.tribulation, self.rareMonsters, self.questBosses, self.bosses, self.nexus]
 
@@ -935,8 +987,7 @@ class QUESTS(DATA):
         super().__init__(rom, 'QuestAsset')
         self.text = text
         self.questArray = self.table['QuestArray']['data'].array
-        with open(get_filename('json/quests.json'),'r') as file:
-            self.json = {int(key):value for key, value in hjson.load(file).items()}
+        self.json = {int(key):value for key, value in load_json('json/quests.json').items()}
 
         ## Organize data for shuffling
         self.questRewards = {i:[] for i in range(8)}
@@ -1002,8 +1053,7 @@ class TREASURES(DATA):
         super().__init__(rom, 'TreasureBoxDataAsset')
         self.text = text
         self.data = list(self.table.values())[0]['data']
-        with open(get_filename('json/treasures.json'),'r') as file:
-            self.json = hjson.load(file)
+        self.json = load_json('json/treasures.json')
 
         self.chests = {i:[] for i in range(8)}
         self.enemyParties = {}
@@ -1079,7 +1129,7 @@ class TREASURES(DATA):
 
 class TEXT(DATA):
     def __init__(self, rom, baseName):
-        super().__init__(rom, baseName)
+        super().__init__(rom, baseName, lazy=True)
         self.data = list(self.table.values())[0]['data']
         keys = list(self.data[next(iter(self.data))].keys())
         self.nameKey = list(filter(lambda key: 'Name' in key, keys))[0]
@@ -1,13 +1,11 @@
 import random
-import hjson
 import sys
 sys.path.append("..")
-from Utilities import get_filename
+from Utilities import load_json
 
 
 def randomActionCosts(jobData):
 
-    actionDict = {a.Name:a for a in jobData.actionsDict.values()}
     done = {}
     for i, job in enumerate(jobData.jobs):
         for action in job.Actions:
@@ -15,8 +13,8 @@ def randomActionCosts(jobData):
                 done[action.Name] = False
 
     # Load groups
-    groups = hjson.load(open(get_filename("json/groups.json"), 'r'))
-    costData = hjson.load(open(get_filename("json/costs.json"), 'r'))
+    groups = load_json("json/groups.json")
+    costData = load_json("json/costs.json")
 
     # Update groups all at once with the same costs
     weightDict = {
@@ -35,21 +33,22 @@ def randomActionCosts(jobData):
         weights[i] = max(weights[i]-1, 0)
 
         # Keep original
-        if actionDict[action].Cost == t:
+        skill = jobData.getAction(action)
+        if skill.Cost == t:
             return
 
         # Update cost
-        actionDict[action].Cost = t
+        skill.Cost = t
         if t == 'ECommandCostEnum::CCE_pq':
-            actionDict[action].CostValue = max(50, 10 * costData[action]['ECommandCostEnum::CCE_MP'] * costData[action]['ECommandCostEnum::CCE_BP'])
+            skill.CostValue = max(50, 10 * costData[action]['ECommandCostEnum::CCE_MP'] * costData[action]['ECommandCostEnum::CCE_BP'])
         else:
-            actionDict[action].CostValue = costData[action][t]
+            skill.CostValue = costData[action][t]
 
         # Update CostType
         if t == 'ECommandCostEnum::CCE_HP':
-            actionDict[action].CostType = 'ECommandCostTypeEnum::CCTE_Maximum_Percent'
+            skill.CostType = 'ECommandCostTypeEnum::CCTE_Maximum_Percent'
         else:
-            actionDict[action].CostType = 'ECommandCostTypeEnum::CCTE_Value'
+            skill.CostType = 'ECommandCostTypeEnum::CCTE_Value'
 
     
     for group in groups.values():
@@ -148,7 +147,7 @@ def shuffleJobAbilities(jobData):
     #### FIRST: FILL ALL GROUPINGS ####
     ###################################
 
-    groups = hjson.load(open(get_filename("json/groups.json"), 'r'))
+    groups = load_json("json/groups.json")
 
     # MONK SKILLS
     monk = jobData.pickIds(1, groups['monk'])
@@ -1,16 +1,49 @@
 import os
 import hashlib
-import sys
-import zstandard # Decompress
+import mmap
+import pickle
+import struct
 import zlib # Compress
-import hjson
-from Utilities import get_filename
+from collections import deque
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+from Utilities import get_filename, get_cache_dir, load_json
 
+# Bump whenever the cached index attributes change layout
+INDEX_VERSION = 3
+INDEX_MAGIC = b'BR2IDX' + bytes([INDEX_VERSION])
+
+# Layouts of the pak index
+INT32 = struct.Struct('<i')
+ENTRY = struct.Struct('<qqqi20si') # base, size, decompSize, compType, sha1, count
+BLOCK = struct.Struct('<qq') # base, end
+BLOCKSIZE = struct.Struct('<xi')
+ENTRYSKIP = struct.Struct('<24xi20xi') # compType, count
 
 class ROM:
-    def __init__(self, fileName):
+    def __init__(self, fileName, useMmap=True):
+        self.pakFile = os.path.abspath(fileName)
         self.file = open(fileName, 'rb')
 
+        # Map the pak read-only so blocks can be sliced without copies
+        self.mmap = None
+        if useMmap:
+            try:
+                self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError): # e.g. out of address space on 32-bit builds
+                self.mmap = None
+        self.view = memoryview(self.mmap) if self.mmap is not None else None
+
+        # Workers for (de)compressing blocks; zstd and zlib both release the GIL
+        self.numThreads = os.cpu_count() or 1
+        self.pool = None
+
+        # Optional on-disk cache of decompressed files
+        self.fileCache = None
+
+        # Lookup of partial paths, built on first use
+        self.pathTree = None
+
         # Compression types (zlib, zstd)
         self.file.seek(-0xa0, 2)
         self.compressionTypes = bytearray(self.file.read())
@@ -25,6 +58,58 @@ class ROM:
         self.data = {}
         self.isPatched = {}
 
+    # Cached indices are only valid for the exact same pak (and pointer files)
+    def getIndexKey(self, *sources):
+        self.file.seek(-44 - 0xa0 - 17, 2)
+        footer = hashlib.sha1(self.file.read()).digest()
+        stat = os.stat(self.pakFile)
+        key = [self.__class__.__name__, footer, os.path.abspath(self.pakFile), stat.st_size, stat.st_mtime_ns]
+        # Sources may be unpacked to a new temp directory each run (pyinstaller)
+        for fileName in sources:
+            with open(fileName, 'rb') as file:
+                key.append(hashlib.sha1(file.read()).digest())
+        return tuple(key)
+
+    def getIndexCache(self):
+        name = hashlib.sha1(self.pakFile.encode()).hexdigest()
+        return os.path.join(get_cache_dir('index'), f"{name}.idx")
+
+    def loadIndex(self, key):
+        try:
+            with open(self.getIndexCache(), 'rb') as file:
+                if file.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                    return False
+                cache = pickle.load(file)
+        except Exception: # Missing, truncated, or otherwise unreadable
+            return False
+        if cache['key'] != key or not cache['verified']:
+            return False
+        for attr, value in cache['attrs'].items():
+            setattr(self, attr, value)
+        return True
+
+    def saveIndex(self, key, attrs, verified):
+        cache = {
+            'key': key,
+            'verified': verified,
+            'attrs': {attr: getattr(self, attr) for attr in attrs},
+        }
+        try:
+            fileName = self.getIndexCache()
+            tmpName = f"{fileName}.{os.getpid()}.tmp"
+            with open(tmpName, 'wb') as file:
+                file.write(INDEX_MAGIC)
+                pickle.dump(cache, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpName, fileName)
+        except OSError: # The cache is optional
+            pass
+
+    def enableFileCache(self, maxSize=512*2**20):
+        try:
+            self.fileCache = FILECACHE(maxSize)
+        except OSError: # The cache is optional
+            self.fileCache = None
+
     def clean(self):
         self.data = {}
         self.isPatched = {}
@@ -36,58 +121,153 @@ class ROM:
             self.isPatched[key] = True
 
     def getFullPath(self, fileName):
-        baseName = os.path.basename(fileName)
-        if baseName in self.fileNames:
-            # Filenames are unique most of the time
-            if len(self.fileNames[baseName]) == 1:
-                return self.fileNames[baseName][0]
-            # When they aren't unique, assume the input is more specific.
-            test = [fileName in f for f in self.fileNames[baseName]]
-            if sum(test) == 1:
-                index = test.index(True)
-                return self.fileNames[baseName][index]
-            print(self.fileNames[baseName])
-            sys.exit(f"Full file path cannot be uniquely determined from {fileName}!")
-                    
-    def extractFile(self, fileName):
+        if fileName in self.files:
+            return fileName
+        if self.pathTree is None:
+            self.pathTree = PATHTREE(self.files)
+        return self.pathTree.find(fileName)
+
+    def extractFile(self, fileName, comp=None):
         key = self.getFullPath(fileName)
         if not key:
             return
 
+        # Already prefetched
+        if comp is None and key in self.data and not self.isPatched[key]:
+            return self.data[key]
+
         f = self.files[key]
         if f['compType']:
-            pointers = f['pointers']
-            data = bytearray([])
-            for start, end in pointers:
-                self.file.seek(f['base']+start)
-                size = end - start
-                tmp = self.readBytes(size)
-                try:
-                    data += zstandard.decompress(tmp) # compType == 1
-                except zstandard.ZstdError:
-                    data += zlib.decompress(tmp) # compType == 2 ?
+            data = self.fileCache.load(f) if self.fileCache else None
+            if data is None:
+                data = self.decompressFile(f, comp)
+                if self.fileCache:
+                    self.fileCache.save(f, data)
+        elif comp is not None:
+            data = comp
         else:
-            pointer = f['base'] + 8*3 + 4 + 20 + 5
-            self.file.seek(pointer)
-            data = self.readBytes(f['size'])
+            # Served straight from the map when possible (no copy)
+            start, end = self.getSpan(f)
+            data = self.readSlice(start, end-start)
 
         self.data[key] = data
         self.isPatched[key] = False
         return self.data[key]
 
-    def compressFile(self, data):
-        base = 0
-        size = 0x10000
-        comp = bytearray([])
+    # Extract many files, reading the pak sequentially in large chunks
+    def extractFiles(self, fileNames, maxGap=0x10000):
+        keys = {}
+        for fileName in fileNames:
+            key = self.getFullPath(fileName)
+            if key:
+                keys[fileName] = key
+
+        # Group files stored close together into runs
+        runs = []
+        spans = {key: self.getSpan(self.files[key]) for key in set(keys.values())}
+        for key in sorted(spans, key=spans.get):
+            start, end = spans[key]
+            if runs and start - runs[-1][1] <= maxGap:
+                runs[-1][1] = max(runs[-1][1], end)
+                runs[-1][2].append(key)
+            else:
+                runs.append([start, end, [key]])
+
+        for start, end, run in runs:
+            chunk = memoryview(self.readSlice(start, end-start))
+            for key in run:
+                a, b = spans[key]
+                self.extractFile(key, chunk[a-start:b-start])
+
+        return {fileName: self.data[key] for fileName, key in keys.items()}
+
+    # Location of the (compressed) file data in the pak
+    def getSpan(self, f):
+        if not f['pointers']:
+            return f['base'], f['base']
+        if f['compType']:
+            return f['base'] + f['pointers'][0][0], f['base'] + f['pointers'][-1][1]
+        start = f['base'] + 8*3+4+20+5
+        return start, start + f['size']
+
+    def getPool(self):
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers=self.numThreads)
+        return self.pool
+
+    def decompressBlock(self, block):
+        if block[:4] == b'\x28\xb5\x2f\xfd': # zstd frame magic
+            import zstandard # Only needed for Switch paks
+            return zstandard.decompress(block)
+        return zlib.decompress(block)
+
+    def decompressFile(self, f, comp=None):
+        pointers = f['pointers']
+        data = bytearray(f['decompSize'])
+        if not pointers:
+            return data
+
+        # Blocks are contiguous, so grab them all with one read
+        first = pointers[0][0]
+        if comp is None:
+            start, end = self.getSpan(f)
+            comp = self.readSlice(start, end-start)
+        comp = memoryview(comp)
+        blockSize = f['blockSize']
+
+        def decompress(i):
+            start, end = pointers[i]
+            block = self.decompressBlock(comp[start-first:end-first])
+            base = i * blockSize
+            assert len(block) == min(blockSize, len(data) - base)
+            data[base:base+len(block)] = block
+
+        if len(pointers) > 1 and self.numThreads > 1:
+            list(self.getPool().map(decompress, range(len(pointers))))
+        else:
+            for i in range(len(pointers)):
+                decompress(i)
+        return data
+
+    def splitBlocks(self, data, size=0x10000):
+        view = memoryview(data)
+        return [view[base:base+size] for base in range(0, len(view), size)]
+
+    def joinBlocks(self, blocks):
         pointers = []
-        while base < len(data):
-            start = len(comp)
-            comp += zlib.compress(data[base:base+size])
-            base += size
-            end = len(comp)
-            pointers.append((start, end))
-        return comp, pointers
-        
+        start = 0
+        for block in blocks:
+            pointers.append((start, start+len(block)))
+            start += len(block)
+        return b''.join(blocks), pointers
+
+    def compressFile(self, data):
+        blocks = [zlib.compress(block) for block in self.splitBlocks(data)]
+        return self.joinBlocks(blocks)
+
+    # Compress the chunks of several files at once, yielding them file by file
+    def compressFiles(self, keys):
+        if self.numThreads == 1:
+            for key in keys:
+                yield key, *self.compressFile(self.data[key])
+            return
+        pool = self.getPool()
+        pending = deque()
+        queued = 0
+        def collect():
+            key, futures = pending.popleft()
+            return key, *self.joinBlocks([future.result() for future in futures])
+        for key in keys:
+            blocks = self.splitBlocks(self.data[key])
+            pending.append((key, [pool.submit(zlib.compress, block) for block in blocks]))
+            queued += len(blocks)
+            # Only keep a few blocks per worker in flight
+            while queued > 4 * self.numThreads:
+                queued -= len(pending[0][1])
+                yield collect()
+        while pending:
+            yield collect()
+
     def readFileEntry(self, fileName):
         assert fileName not in self.files
         f = {}
@@ -105,7 +285,8 @@ class ROM:
                     self.readInt(8), # end
                     # end - base == size
                 ])
-            self.file.seek(5, 1)
+            self.file.seek(1, 1)
+            f['blockSize'] = self.readInt(4) # Decompressed size of each block
         else: # File is not compressed
             assert f['count'] == 0
             self.file.seek(1, 1)
@@ -113,7 +294,9 @@ class ROM:
                 f['base'] + 8*3+4+20+5,
                 f['base'] + 8*3+4+20+5 + f['size'],
             ])
-        # Store entry
+        self.addFileEntry(fileName, f)
+
+    def addFileEntry(self, fileName, f):
         self.files[fileName] = f
 
         # Map baseName to full file path (important when there are MANY files!) 
@@ -122,6 +305,62 @@ class ROM:
             self.fileNames[baseName] = []
         self.fileNames[baseName].append(fileName)
 
+    # Scan the whole file section from a single read.
+    # Entries are only decoded when first accessed (see FILEINDEX).
+    def parseIndex(self, start, size):
+        data = bytes(self.readSlice(start, size))
+        view = memoryview(data)
+        unpackInt = INT32.unpack_from
+        unpackSkip = ENTRYSKIP.unpack_from
+
+        size, = unpackInt(data, 0)
+        baseDir = self.readIndexString(view[4:], size)
+        offset = 4 + (size if size >= 0 else -size*2)
+        offset += 4 # Number of files (== len(self.files))
+
+        # Only find where names and entries are
+        names = []
+        entries = []
+        appendName = names.append
+        appendEntry = entries.append
+        utf16 = False
+        end = len(data)
+        while offset < end:
+            size, = unpackInt(data, offset)
+            offset += 4
+            appendName(offset)
+            if size < 0:
+                utf16 = True
+                size = -size*2
+            offset += size
+            appendEntry(offset)
+            compType, count = unpackSkip(data, offset)
+            offset += count*BLOCK.size + ENTRY.size + BLOCKSIZE.size if compType else ENTRY.size + 1
+
+        # Decode all names at once; they are null terminated already
+        if utf16:
+            fileNames = []
+            for start, end in zip(names, entries):
+                size, = unpackInt(data, start-4)
+                fileNames.append(self.readIndexString(view[start:end], size))
+        else:
+            fileNames = b''.join(map(view.__getitem__, map(slice, names, entries))).decode('utf-8').split('\x00')[:-1]
+
+        files = FILEINDEX(data, zip(fileNames, entries))
+        assert len(files) == len(entries)
+        for fileName in fileNames:
+            baseName = fileName.rpartition('/')[2]
+            if baseName not in self.fileNames:
+                self.fileNames[baseName] = []
+            self.fileNames[baseName].append(fileName)
+        self.files = files
+        return baseDir
+
+    def readIndexString(self, data, size):
+        if size < 0:
+            return str(data[:-size*2], 'utf-16')[:-1]
+        return str(data[:size], 'utf-8')[:-1]
+
     def readString(self, size):
         if size < 0:
             s = self.readBytes(-size*2)
@@ -147,6 +386,12 @@ class ROM:
     def readBytes(self, size):
         return self.file.read(size)
 
+    def readSlice(self, start, size):
+        if self.view is not None:
+            return self.view[start:start+size]
+        self.file.seek(start)
+        return self.file.read(size)
+
     def checkSHA(self, base, size, sha1):
         self.file.seek(base)
         data = self.readBytes(size)
@@ -168,76 +413,250 @@ class ROM:
         return self.baseDir+comDir, comDir
     
     def buildPak(self, output):
-        pakFile = bytearray([]) # This points to pakData entries
-        pakData = bytearray([]) # This will in include comp/decomp data
         baseDir, comDir = self.getBaseDir()
-        baseDirBytes, size = self.pakString(baseDir)
-        pakFile += self.pakInt(size)
-        pakFile += baseDirBytes
-        # Number of files
-        pakFile += self.pakInt(sum(self.isPatched.values()))
-        # Loop over files
-        for key, data in self.data.items():
-            # Only include modified files
-            if not self.isPatched[key]:
+        keys = [key for key in self.data if self.isPatched[key]]
+        # Compression runs ahead on the pool while finished entries are written
+        compressed = self.compressFiles([key for key in keys if self.files[key]['compType']])
+        with PAKWRITER(self, output) as pak:
+            for key in keys:
+                if self.files[key]['compType']:
+                    _, comp, offsets = next(compressed)
+                    pak.addFile(key, self.data[key], comp, offsets)
+                else:
+                    pak.addFile(key, self.data[key])
+            pak.finish(baseDir, comDir)
+
+
+class AmbiguousPathError(Exception):
+    pass
+
+
+# Maps partial paths to full paths, matching path segments from the end.
+# Each node stores its full path, or None when several paths share that suffix.
+class PATHTREE:
+    def __init__(self, fileNames):
+        self.fileNames = fileNames
+        self.root = {}
+        for fileName in fileNames:
+            node = self.root
+            for segment in reversed(fileName.split('/')):
+                if segment not in node:
+                    node[segment] = [{}, fileName]
+                else:
+                    node[segment][1] = None
+                node = node[segment][0]
+
+    def find(self, fileName):
+        nodes = self.root
+        node = None
+        for segment in reversed(fileName.split('/')):
+            if segment not in nodes:
+                return
+            node = nodes[segment]
+            nodes = node[0]
+        if node[1] is None:
+            candidates = [f for f in self.fileNames if f.endswith('/' + fileName)]
+            raise AmbiguousPathError(f"Full file path cannot be uniquely determined from {fileName}! Candidates: {candidates}")
+        return node[1]
+
+
+# Decompressed files addressed by the SHA1 of their compressed data.
+# Least recently used files get evicted once the cache exceeds maxSize.
+class FILECACHE:
+    def __init__(self, maxSize):
+        self.dir = get_cache_dir('files')
+        self.maxSize = maxSize
+
+    def getPath(self, f):
+        if not any(f['sha1']): # Hashes are not always stored
+            return
+        return os.path.join(self.dir, f"{f['sha1'].hex()}_{f['decompSize']:x}")
+
+    def load(self, f):
+        path = self.getPath(f)
+        if not path or not f['decompSize']:
+            return
+        try:
+            with open(path, 'rb') as file:
+                if os.fstat(file.fileno()).st_size != f['decompSize']:
+                    return
+                data = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+            os.utime(path) # Mark as recently used
+        except (OSError, ValueError):
+            return
+        return data
+
+    def save(self, f, data):
+        path = self.getPath(f)
+        if not path or len(data) > self.maxSize:
+            return
+        try:
+            tmpPath = f"{path}.{os.getpid()}.tmp"
+            with open(tmpPath, 'wb') as file:
+                file.write(data)
+            os.replace(tmpPath, path)
+        except OSError:
+            return
+        self.evict()
+
+    def evict(self):
+        files = []
+        for entry in os.scandir(self.dir):
+            try:
+                stat = entry.stat()
+            except OSError:
                 continue
-            base = len(pakData)
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.maxSize:
+                break
+            try:
+                os.remove(path)
+            except OSError: # e.g. still mapped on Windows
+                continue
+            total -= size
+
+
+# Index entries, decoded from the raw file section on first access.
+# Every lookup (get, items, values, copy, ...) goes through __getitem__.
+class FILEINDEX(MutableMapping):
+    def __init__(self, index, offsets):
+        self.index = index
+        self.entries = dict(offsets) # Offsets into index until decoded
+
+    def __getitem__(self, fileName):
+        f = self.entries[fileName]
+        if isinstance(f, int):
+            f = self.decodeEntry(f)
+            self.entries[fileName] = f
+        return f
+
+    def __setitem__(self, fileName, f):
+        self.entries[fileName] = f
+
+    def __delitem__(self, fileName):
+        del self.entries[fileName]
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, fileName):
+        return fileName in self.entries
+
+    def copy(self):
+        return dict(self.items())
+
+    def decodeEntry(self, offset):
+        base, size, decompSize, compType, sha1, count = ENTRY.unpack_from(self.index, offset)
+        offset += ENTRY.size
+        f = {
+            'base': base,
+            'size': size,
+            'decompSize': decompSize,
+            'compType': compType,
+            'sha1': sha1, # compressed data
+            'count': count,
+        }
+        if compType:
+            f['pointers'] = [list(BLOCK.unpack_from(self.index, offset + i*BLOCK.size)) for i in range(count)]
+            f['blockSize'], = BLOCKSIZE.unpack_from(self.index, offset + count*BLOCK.size)
+        else: # File is not compressed
+            assert count == 0
+            f['pointers'] = [[base + 8*3+4+20+5, base + 8*3+4+20+5 + size]]
+        return f
+
+
+# Writes pak entries as they come; only the (small) index is kept in memory
+class PAKWRITER:
+    def __init__(self, rom, output):
+        self.rom = rom
+        self.file = open(output, 'wb')
+        self.size = 0     # Bytes written so far
+        self.entries = [] # Filename and index record of each entry
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.file.close()
+
+    def write(self, data):
+        self.file.write(data)
+        self.size += len(data)
+
+    def addFile(self, key, data, comp=None, offsets=None):
+        rom = self.rom
+        base = self.size
+        if comp is not None:
+            x = rom.pakInt(len(comp), size=8)                     # Entry size (compressed)
+            x += rom.pakInt(len(data), size=8)                    # Decompressed size
+            x += rom.pakInt(1)                                    # Is compressed?
+            x += rom.getSHA(comp)                                 # SHA1 of (compressed) data
+            x += rom.pakInt(len(offsets))                         # Number of zipped segments
+            pointer = 0x34 + 8*2*len(offsets) + 5                 # Offsets to zipped segments
+            for start, end in offsets:
+                x += rom.pakInt(pointer + start, size=8)          # Start of entry
+                x += rom.pakInt(pointer + end, size=8)            # End of entry (==start of next entry)
+            # Max size of decompressed entry
+            x += rom.pakInt(0, size=1)
+            x += rom.pakInt(min([len(data), 0x10000]))            # Max size of decompressed entry
+        else:
+            comp = data
+            x = rom.pakInt(len(data), size=8)                     # Entry size (decompressed)
+            x += rom.pakInt(len(data), size=8)                    # Decompressed size
+            x += rom.pakInt(0)                                    # Is compressed?
+            x += rom.getSHA(data)                                 # SHA1 of (decompressed) data
+            x += rom.pakInt(0, size=5)                            # Number of zipped segments
+        self.write(rom.pakInt(0, size=8))
+        self.write(x)
+        self.write(comp)
+        self.entries.append((key, rom.pakInt(base, size=8) + x))
+
+    def finish(self, baseDir, comDir):
+        rom = self.rom
+        dataSize = self.size
+        sha = hashlib.sha1()
+        def writeIndex(data):
+            sha.update(data)
+            self.write(data)
+
+        baseDirBytes, size = rom.pakString(baseDir)
+        writeIndex(rom.pakInt(size))
+        writeIndex(baseDirBytes)
+        # Number of files
+        writeIndex(rom.pakInt(len(self.entries)))
+        for key, x in self.entries:
             # Filename (relative to the new base directory)
             if comDir:
                 tmpDir = key.split(comDir)[-1]
             else:
                 tmpDir = key
-            fileName, size = self.pakString(tmpDir)
-            pakFile += self.pakInt(size)
-            pakFile += fileName
-            # Pointers
-            pakFile += self.pakInt(base, size=8)
-            pakData += self.pakInt(0, size=8)
-            # Compress
-            x = bytearray([])
-            if self.files[key]['compType']:
-                # Compress data
-                comp, offsets = self.compressFile(data)
-                x = self.pakInt(len(comp), size=8)                    # Entry size (compressed)
-                x += self.pakInt(len(data), size=8)                   # Decompressed size
-                x += self.pakInt(1)                                   # Is compressed?
-                x += self.getSHA(comp)                                # SHA1 of (compressed) data
-                x += self.pakInt(len(offsets))                        # Number of zipped segments
-                pointer = 0x34 + 8*2*len(offsets) + 5                 # Offsets to zipped segments
-                for start, end in offsets:
-                    x += self.pakInt(pointer + start, size=8)         # Start of entry
-                    x += self.pakInt(pointer + end, size=8)           # End of entry (==start of next entry)
-                # Max size of decompressed entry
-                x += self.pakInt(0, size=1)
-                x += self.pakInt(min([len(data), 0x10000]))           # Max size of decompressed entry
-                pakFile += x
-                pakData += x + comp
-            else:
-                x += self.pakInt(len(data), size=8)                   # Entry size (decompressed)
-                x += self.pakInt(len(data), size=8)                   # Decompressed size
-                x += self.pakInt(0)                                   # Is compressed?
-                x += self.getSHA(data)                                # SHA1 of (decompressed) data
-                x += self.pakInt(0, size=5)                           # Number of zipped segments
-                pakFile += x
-                pakData += x + data
+            fileName, size = rom.pakString(tmpDir)
+            writeIndex(rom.pakInt(size))
+            writeIndex(fileName)
+            writeIndex(x)
         # FINISH PAK FILE
-        sha = self.getSHA(pakFile)
-        fileSize = len(pakFile)
-        pakFile += self.pakInt(0, size=17)
-        pakFile += self.pakInt(self.magic, size=8)
-        pakFile += self.pakInt(len(pakData), size=8)
-        pakFile += self.pakInt(fileSize, size=8)
-        pakFile += sha
-        # Build Pak
-        with open(output, 'wb') as file:
-            file.write(pakData)
-            file.write(pakFile)
-            file.write(self.compressionTypes)
+        fileSize = self.size - dataSize
+        self.write(rom.pakInt(0, size=17))
+        self.write(rom.pakInt(rom.magic, size=8))
+        self.write(rom.pakInt(dataSize, size=8))
+        self.write(rom.pakInt(fileSize, size=8))
+        self.write(sha.digest())
+        self.write(rom.compressionTypes)
 
 
 class ROM_SWITCH(ROM):
-    def __init__(self, fileName):
-        super(ROM_SWITCH, self).__init__(fileName)
+    def __init__(self, fileName, useMmap=True, useCache=True):
+        super(ROM_SWITCH, self).__init__(fileName, useMmap)
+
+        attrs = ['magic', 'fileSectionStart', 'fileSectionSize', 'fileSectionSHA1', 'baseDir', 'files', 'fileNames']
+        key = self.getIndexKey()
+        if useCache and self.loadIndex(key):
+            return
 
         # Load pointers to files
         self.file.seek(-44 - 0xa0, 2)
@@ -245,44 +664,55 @@ class ROM_SWITCH(ROM):
         self.fileSectionStart = self.readInt(8)
         self.fileSectionSize = self.readInt(8)
         self.fileSectionSHA1 = self.readBytes(20)
-        assert self.checkSHA(self.fileSectionStart, self.fileSectionSize, self.fileSectionSHA1)
+        verified = self.checkSHA(self.fileSectionStart, self.fileSectionSize, self.fileSectionSHA1)
+        assert verified
         
-        # Setup for reading entries
-        self.file.seek(self.fileSectionStart)
-        size = self.readInt(4)
-        self.baseDir = self.readString(size)
-        self.file.seek(4, 1) # Number of files (== len(self.files))
-
         # Read entries
-        while self.file.tell() < self.fileSectionStart + self.fileSectionSize:
-            self.readFileEntry()
+        self.baseDir = self.parseIndex(self.fileSectionStart, self.fileSectionSize)
 
-    def readFileEntry(self):
-        size = self.readInt(4)
-        fileName = self.readString(size)
-        super(ROM_SWITCH, self).readFileEntry(fileName)
+        if useCache:
+            self.saveIndex(key, attrs, verified)
 
 
 class ROM_PC(ROM):
-    def __init__(self, fileName):
-        super(ROM_PC, self).__init__(fileName)
+    def __init__(self, fileName, useMmap=True, useCache=True):
+        super(ROM_PC, self).__init__(fileName, useMmap)
 
-        # Check SHA
-        self.file.seek(-44 - 0xa0, 2)
+        attrs = ['magic', 'pointers', 'baseDir', 'files', 'fileNames']
+        key = self.getIndexKey(get_filename('json/pointers.json'))
+        if useCache and self.loadIndex(key):
+            return
+
+        # Footer
+        self.file.seek(-44 - 0xa0 - 1, 2)
+        isEncrypted = self.readInt(1)
         self.magic = self.readInt(8)
-        self.file.seek(0x10, 1)
+        indexStart = self.readInt(8)
+        indexSize = self.readInt(8)
         sha = self.readBytes(20)
-        assert int.from_bytes(sha, byteorder='big') == 0xe003b74f42a8556489a87f24644c3bb18d6af4f3
 
-        # Pointers and files
-        self.pointers = hjson.load(open(get_filename('json/pointers.json'),'r'))
-        # self.pointers = hjson.load(open(get_filename('json/pointers_all.json'),'r'))
-        self.baseDir = '../../../'
+        if not isEncrypted:
+            # Read the full index
+            self.pointers = {}
+            verified = self.checkSHA(indexStart, indexSize, sha)
+            assert verified
+            self.baseDir = self.parseIndex(indexStart, indexSize)
+        else:
+            # Only entries listed in pointers.json are available for this exact build
+            verified = int.from_bytes(sha, byteorder='big') == 0xe003b74f42a8556489a87f24644c3bb18d6af4f3
+            assert verified
+
+            # Pointers and files
+            self.pointers = load_json('json/pointers.json')
+            self.baseDir = '../../../'
 
-        # Read entries
-        for fileName, pointer in self.pointers.items():
-            self.file.seek(pointer)
-            self.readFileEntry(fileName)
+            # Read entries
+            for fileName, pointer in self.pointers.items():
+                self.file.seek(pointer)
+                self.readFileEntry(fileName)
+
+        if useCache:
+            self.saveIndex(key, attrs, verified)
 
     def readFileEntry(self, fileName):
         super(ROM_PC, self).readFileEntry(fileName)
@@ -1,5 +1,7 @@
 import sys
 import os
+import hashlib
+import pickle
 
 # Required for pyinstaller
 def get_filename(relative_path):
@@ -10,4 +12,48 @@ def get_filename(relative_path):
         filename = os.path.join(base_path, relative_path)
     return filename
 
-    
+
+# Per-user cache directory for data derived from the game files
+def get_cache_dir(*subdirs):
+    if sys.platform == 'win32' and 'LOCALAPPDATA' in os.environ:
+        base_path = os.environ['LOCALAPPDATA']
+    else:
+        base_path = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    path = os.path.join(base_path, 'BravelyRandomize2', *subdirs)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+# Tables in json/ are parsed once and stored as pickles named by the hash of
+# their source, so edits to the hjson invalidate them. The cache is optional:
+# if it can't be read or written the hjson is just parsed.
+# Every call returns a fresh copy that callers are free to modify.
+_json_tables = {}
+
+def load_json(relative_path):
+    filename = get_filename(relative_path)
+    if filename in _json_tables:
+        return pickle.loads(_json_tables[filename])
+
+    with open(filename, 'rb') as file:
+        source = file.read()
+    path = None
+    try:
+        path = os.path.join(get_cache_dir('json'), f"{hashlib.sha1(source).hexdigest()}.pickle")
+        with open(path, 'rb') as file:
+            data = file.read()
+        table = pickle.loads(data)
+    except Exception: # No cache directory, missing, truncated, or otherwise unreadable
+        import hjson
+        table = hjson.loads(source.decode('utf-8'))
+        data = pickle.dumps(table, pickle.HIGHEST_PROTOCOL)
+        if path:
+            try:
+                tmpPath = f"{path}.{os.getpid()}.tmp"
+                with open(tmpPath, 'wb') as file:
+                    file.write(data)
+                os.replace(tmpPath, path)
+            except OSError:
+                pass
+    _json_tables[filename] = data
+    return table
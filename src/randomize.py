@@ -1,16 +1,42 @@
 import sys
 sys.path.append('src')
 from ROM import ROM
-from Data import DATA, QUESTS, ITEMDATA, SHOPDATA, JOBSTATS, JOBDATA, MONSTERPARTY, MONSTERS, MONSTERABILITIES, TREASURES, TEXT, ACTIONS, SUPPORT, TIPPING#, AI
+from Data import DATA, REGISTRY, QUESTS, ITEMDATA, SHOPDATA, JOBSTATS, JOBDATA, MONSTERPARTY, MONSTERS, MONSTERABILITIES, TREASURES, TEXT, ACTIONS, SUPPORT, TIPPING#, AI
 from Items import shuffleItems, randomChestBattles
 from Battles import shuffleResistance, shuffleBosses, scaleBosses
 from Jobs import shuffleJobAbilities, randomActionCosts
 import random
 import os
 import shutil
-import hjson
 
 class MOD:
+    # Attribute -> (files, class, *args); args naming another asset or the
+    # registry are replaced by it, others (file names) are passed as is
+    ASSETS = {
+        # Text files
+        'actionText': (['L10N/en/DataAsset/Ability/Player/ActionAbilityTextAsset'], TEXT, 'L10N/en/DataAsset/Ability/Player/ActionAbilityTextAsset'),
+        'supportText': (['L10N/en/DataAsset/Ability/Player/SupportAbilityTextAsset'], TEXT, 'L10N/en/DataAsset/Ability/Player/SupportAbilityTextAsset'),
+        'specialText': (['L10N/en/DataAsset/Ability/Player/SpecialAbilityTextAsset'], TEXT, 'L10N/en/DataAsset/Ability/Player/SpecialAbilityTextAsset'),
+        'itemText': (['L10N/en/DataAsset/Item/ItemTextAsset'], TEXT, 'L10N/en/DataAsset/Item/ItemTextAsset'),
+        'monsterText': (['L10N/en/DataAsset/Monster/MonsterTextDataAsset'], TEXT, 'L10N/en/DataAsset/Monster/MonsterTextDataAsset'),
+        'monsterAbilityText': (['L10N/en/DataAsset/Ability/Monster/MonsterActionAbilityTextAsset'], TEXT, 'L10N/en/DataAsset/Ability/Monster/MonsterActionAbilityTextAsset'),
+        'monsterSupportText': (['L10N/en/DataAsset/Ability/Monster/MonsterSupportAbilityTextAsset'], TEXT, 'L10N/en/DataAsset/Ability/Monster/MonsterSupportAbilityTextAsset'),
+        # Assets
+        'support': (['SupportAbilityAsset'], SUPPORT, 'supportText'),
+        'actions': (['ActionAbilityAsset'], ACTIONS, 'actionText'),
+        'shops': ([f'ShopSalesListDataAsset_{index}' for index in SHOPDATA.indices], SHOPDATA, 'itemText', 'registry'),
+        'items': (['ItemDataAsset'], ITEMDATA, 'itemText', 'registry'),
+        'jobstats': (['JobCorrectionAsset'], JOBSTATS),
+        'jobdata': (['JobDataAsset'], JOBDATA, 'actions', 'support', 'registry'),
+        'monsterParty': (['MonsterPartyAsset'], MONSTERPARTY),
+        'monsters': (['MonsterDataAsset'], MONSTERS, 'monsterText', 'itemText', 'monsterParty'),
+        # 'enemyAI': ([], AI, 'monsterText', 'monsters', 'monsterParty', 'monsterAbilityText', 'monsterSupportText'),
+        'monsterAbilities': (['MonsterActionAbilityAsset'], MONSTERABILITIES, 'monsterAbilityText'),
+        'treasures': (['TreasureBoxDataAsset'], TREASURES, 'itemText'),
+        'quests': (['QuestAsset'], QUESTS, 'itemText'),
+        'tips': (['L10N/en/DataAsset/TipsDataAsset'], TIPPING),
+    }
+
     def __init__(self, rom, settings):
         self.settings = settings
 
@@ -22,29 +48,66 @@ class MOD:
         # Load ROM
         self.rom = rom
 
-        # Text files
-        self.actionText = TEXT(self.rom, 'L10N/en/DataAsset/Ability/Player/ActionAbilityTextAsset')
-        self.supportText = TEXT(self.rom, 'L10N/en/DataAsset/Ability/Player/SupportAbilityTextAsset')
-        self.specialText = TEXT(self.rom, 'L10N/en/DataAsset/Ability/Player/SpecialAbilityTextAsset')
-        self.itemText = TEXT(self.rom, 'L10N/en/DataAsset/Item/ItemTextAsset')
-        self.monsterText = TEXT(self.rom, 'L10N/en/DataAsset/Monster/MonsterTextDataAsset')
-        self.monsterAbilityText = TEXT(self.rom, 'L10N/en/DataAsset/Ability/Monster/MonsterActionAbilityTextAsset')
-        self.monsterSupportText = TEXT(self.rom, 'L10N/en/DataAsset/Ability/Monster/MonsterSupportAbilityTextAsset')
+        # Names and IDs shared by the assets of this run
+        self.registry = REGISTRY()
 
-        # Assets
-        self.support = SUPPORT(self.rom, self.supportText)
-        self.actions = ACTIONS(self.rom, self.actionText)
-        self.shops = SHOPDATA(self.rom, self.itemText)
-        self.items = ITEMDATA(self.rom, self.itemText)
-        self.jobstats = JOBSTATS(self.rom)
-        self.jobdata = JOBDATA(self.rom, self.actions, self.support)
-        self.monsterParty = MONSTERPARTY(self.rom)
-        self.monsters = MONSTERS(self.rom, self.monsterText, self.itemText, self.monsterParty)
-        # self.enemyAI = AI(self.rom, self.monsterText, self.monsters, self.monsterParty, self.monsterAbilityText, self.monsterSupportText)
-        self.monsterAbilities = MONSTERABILITIES(self.rom, self.monsterAbilityText)
-        self.treasures = TREASURES(self.rom, self.itemText)
-        self.quests = QUESTS(self.rom, self.itemText)
-        self.tips = TIPPING(self.rom)
+        # Load what the settings need up front; anything else on first access
+        self.loadAssets(self.getRequiredAssets())
+
+    def getRequiredAssets(self):
+        # Always modified by qualityOfLife and dump
+        assets = ['monsters', 'monsterParty', 'tips']
+        if self.settings['job-stats'] or self.settings['job-affinities']:
+            assets.append('jobstats')
+        if self.settings['job-abilities'] or self.settings['job-costs']:
+            assets.append('jobdata')
+        if self.settings['items']:
+            assets += ['treasures', 'quests']
+        if self.settings['chest-battles']:
+            assets.append('treasures')
+        if self.settings['bosses']:
+            assets.append('monsterAbilities')
+        if self.settings['teleport-stone-costs'] or self.settings['magnifying-glass-costs']:
+            assets.append('items')
+        if self.settings['job-abilities'] or self.settings['bosses'] or self.settings['resistance']:
+            assets.append('shops')
+        return assets
+
+    # Assets are only loaded when first used
+    def __getattr__(self, name):
+        if name not in MOD.ASSETS:
+            raise AttributeError(name)
+        self.loadAssets([name])
+        return self.__dict__[name]
+
+    def isLoaded(self, name):
+        return name in self.__dict__
+
+    # Load assets after the ones they depend on
+    def loadAssets(self, names):
+        # Dependencies first
+        order = []
+        def visit(name):
+            if name in order or self.isLoaded(name):
+                return
+            for arg in MOD.ASSETS[name][2:]:
+                if arg in MOD.ASSETS:
+                    visit(arg)
+            order.append(name)
+        for name in names:
+            visit(name)
+        if not order:
+            return
+
+        # Extract everything needed in one pass through the pak
+        files = [f for name in order for f in MOD.ASSETS[name][0]]
+        self.rom.extractFiles([f'{f}.{ext}' for f in files for ext in ['uasset', 'uexp']])
+
+        # Parse in order; args naming an asset are replaced by it
+        for name in order:
+            files, cls, *args = MOD.ASSETS[name]
+            args = [self.__dict__[arg] if arg in MOD.ASSETS or arg == 'registry' else arg for arg in args]
+            setattr(self, name, cls(self.rom, *args))
 
     def failed(self):
         print(f"Randomizer failed! Removing directory {self.outPath}.")
@@ -155,30 +218,26 @@ class MOD:
             self.shops.earlyAccess("Dark Drops")
             self.shops.earlyAccess("Stardust")
 
+    # Only for assets that were loaded, i.e. could have changed
     def _spoilerLog(self):
         self.monsters.spoilers(os.path.join(self.outPath, 'spoilers_monsters.log'))
         self.monsterParty.spoilers(os.path.join(self.outPath, 'spoilers_bosses.log'))
-        self.quests.spoilers(os.path.join(self.outPath, 'spoilers_quests.log'))
-        self.treasures.spoilers(os.path.join(self.outPath, 'spoilers_treasures.log'))
-        self.jobdata.spoilers(os.path.join(self.outPath, 'spoilers_jobs.log'))
-        self.jobstats.spoilers_stats(os.path.join(self.outPath, 'spoilers_stats.log'))
-        self.jobstats.spoilers_affinities(os.path.join(self.outPath, 'spoilers_affinities.log'))
+        if self.isLoaded('quests'):
+            self.quests.spoilers(os.path.join(self.outPath, 'spoilers_quests.log'))
+        if self.isLoaded('treasures'):
+            self.treasures.spoilers(os.path.join(self.outPath, 'spoilers_treasures.log'))
+        if self.isLoaded('jobdata'):
+            self.jobdata.spoilers(os.path.join(self.outPath, 'spoilers_jobs.log'))
+        if self.isLoaded('jobstats'):
+            self.jobstats.spoilers_stats(os.path.join(self.outPath, 'spoilers_stats.log'))
+            self.jobstats.spoilers_affinities(os.path.join(self.outPath, 'spoilers_affinities.log'))
 
     def dump(self, fileName):
         ### UPDATE SHUFFLED TABLES
-        self.shops.update()
-        self.items.update()
-        self.jobstats.update()
-        self.jobdata.update()
-        self.monsters.update()
-        self.monsterParty.update()
-        # self.enemyAI.update()
-        self.monsterAbilities.update()
-        self.treasures.update()
-        self.quests.update()
-        self.actions.update()
-        self.support.update()
-        self.tips.update()
+        # Assets never loaded are unchanged
+        for name in ['shops', 'items', 'jobstats', 'jobdata', 'monsters', 'monsterParty', 'monsterAbilities', 'treasures', 'quests', 'actions', 'support', 'tips']:
+            if self.isLoaded(name):
+                getattr(self, name).update()
 
         # Dump pak
         self.rom.buildPak(fileName)
@@ -187,6 +246,7 @@ class MOD:
         self._spoilerLog()
         
         # Print settings
+        import hjson
         with open(os.path.join(self.outPath, 'settings.json'), 'w') as file:
             hjson.dump(self.settings, file)
 
@@ -209,3 +269,25 @@ class SWITCH(MOD):
         os.makedirs(pakPath)
         pakName = os.path.join(pakPath, 'Sunrise-E-Switch_2_P.pak')
         super(SWITCH, self).dump(pakName)
+
+
+def randomize(rom, settings):
+    try:
+        # Start with a fresh ROM
+        rom.clean()
+        # Load data
+        if settings['system'] == 'Steam':
+            mod = STEAM(rom, settings)
+        elif settings['system'] == 'Switch':
+            mod = SWITCH(rom, settings)
+        else:
+            sys.exit(f"{settings['system']} not included in the randomizer!")
+        # Modify data
+        mod.randomize()
+        mod.qualityOfLife()
+        # Dump pak
+        mod.dump()
+        return True
+    except:
+        mod.failed()
+        return False